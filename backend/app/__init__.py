@@ -23,6 +23,30 @@ def create_app(config_name=None):
     # Create upload folder if it doesn't exist
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     
+    # Bounded concurrency for generations (offline and LLM lanes)
+    from app.services.admission import AdmissionGate
+    app.extensions['admission'] = AdmissionGate.from_config(app.config)
+    
+    # Job queue for the separate generation worker tier (worker.py)
+    from app.services.job_queue import get_job_queue
+    app.extensions['job_queue'] = get_job_queue(app.config['JOB_QUEUE_URL'], app.config['JOB_MAX_ATTEMPTS'],
+                                                app.config['JOB_RESULT_TTL'])
+    
+    # Bounded store of opt-in request profiles
+    from app.services.profiling import ProfileStore
+    app.extensions['profiles'] = ProfileStore(app.config['PROFILING_MAX_PROFILES'])
+    
+    # Background LLM upgrades for progressive uploads (offline preview first),
+    # results kept in the job queue backend so every web process can serve polls
+    from app.services.progressive import ProgressiveGenerator, UpgradeStore
+    app.extensions['progressive'] = ProgressiveGenerator(
+        UpgradeStore(app.extensions['job_queue']),
+        app.extensions['admission'].lane(AdmissionGate.LLM),
+        app.extensions['admission'].lane(AdmissionGate.LLM_ASYNC),
+        max_workers=app.config['PROGRESSIVE_WORKERS'],
+        max_pending=app.config['PROGRESSIVE_MAX_PENDING']
+    )
+    
     # Health check endpoint
     @app.route('/', methods=['GET', 'HEAD'])
     def health_check():
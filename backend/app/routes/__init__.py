@@ -2,4 +2,4 @@ from flask import Blueprint
 
 upload_bp = Blueprint('upload', __name__, url_prefix='/api')
 
-from app.routes import upload
+from app.routes import upload, metrics, jobs, admin, export
@@ -0,0 +1,69 @@
+from flask import request, jsonify, current_app, Response
+from app.routes import upload_bp
+from app.services.themes import theme_library
+import hmac
+
+
+def _authorized():
+    """Admin endpoints need ADMIN_TOKEN configured and sent as X-Admin-Token"""
+    token = current_app.config.get('ADMIN_TOKEN')
+    supplied = request.headers.get('X-Admin-Token', '')
+    return bool(token) and hmac.compare_digest(token, supplied)
+
+
+@upload_bp.route('/admin/profiles', methods=['GET'])
+def list_profiles():
+    """List captured request profiles, newest first"""
+    if not _authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify({'profiles': current_app.extensions['profiles'].list()}), 200
+
+
+@upload_bp.route('/admin/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """
+    Profile details with a pstats summary of the top functions
+    Add ?format=prof to download the raw profile (open with pstats or snakeviz)
+    """
+    if not _authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    profile = current_app.extensions['profiles'].get(profile_id)
+    if profile is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    
+    if request.args.get('format') == 'prof':
+        return Response(
+            profile.dump(),
+            mimetype='application/octet-stream',
+            headers={'Content-Disposition': f'attachment; filename=upload-{profile_id}.prof'}
+        )
+    
+    body = profile.to_dict()
+    body['summary'] = profile.summary()
+    return jsonify(body), 200
+
+
+@upload_bp.route('/admin/themes', methods=['GET'])
+def list_pending_themes():
+    """Harvested LLM designs waiting for review (not served to anyone yet)"""
+    if not _authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify({'pending': [
+        {'name': theme.name, 'css': theme.css} for theme in theme_library.pending_themes()
+    ]}), 200
+
+
+@upload_bp.route('/admin/themes/<name>', methods=['POST', 'DELETE'])
+def review_theme(name):
+    """POST promotes a pending design into the shared rotation, DELETE drops it"""
+    if not _authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    if request.method == 'POST':
+        found = theme_library.promote(name) is not None
+    else:
+        found = theme_library.reject(name)
+    if not found:
+        return jsonify({'error': 'Theme not found'}), 404
+    return jsonify({'success': True}), 200
@@ -0,0 +1,26 @@
+from flask import request, jsonify, Response, stream_with_context
+from app.routes import upload_bp
+from app.services.static_export import build_static_bundle, stream_zip
+
+
+@upload_bp.route('/export', methods=['POST'])
+def export_static_site():
+    """
+    Export a generated portfolio as a deployable static-site zip
+    Expected: JSON {"portfolio": "<html>..."} or form field 'portfolio'
+    """
+    try:
+        data = request.get_json(silent=True) or request.form
+        html = (data.get('portfolio') or '').strip()
+        if not html:
+            return jsonify({'error': 'No portfolio HTML provided'}), 400
+        
+        files = build_static_bundle(html)
+        return Response(
+            stream_with_context(stream_zip(files)),
+            mimetype='application/zip',
+            headers={'Content-Disposition': 'attachment; filename=portfolio-site.zip'}
+        )
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
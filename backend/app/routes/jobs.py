@@ -0,0 +1,51 @@
+from flask import request, jsonify, current_app
+from app.routes import upload_bp
+from app.routes.upload import allowed_file
+from app.services.generation_worker import build_job_payload
+from werkzeug.utils import secure_filename
+
+
+@upload_bp.route('/jobs', methods=['POST'])
+def submit_job():
+    """
+    Queue a resume for generation by the worker tier
+    Expected: same multipart/form-data as /api/upload. Returns 202 with a job_id to poll.
+    """
+    try:
+        if 'resume' not in request.files:
+            return jsonify({'error': 'No resume file provided'}), 400
+        
+        file = request.files['resume']
+        
+        if file.filename == '':
+            return jsonify({'error': 'No file selected'}), 400
+        
+        if not allowed_file(file.filename):
+            return jsonify({'error': 'File type not allowed. Use PDF, DOC, DOCX, or TXT'}), 400
+        
+        model = request.form.get('model', 'offline')
+        api_key = request.form.get('api_key', '').strip()
+        
+        payload = build_job_payload(secure_filename(file.filename), file.read(), model, api_key)
+        job_id = current_app.extensions['job_queue'].enqueue(payload)
+        
+        return jsonify({'success': True, 'job_id': job_id, 'status': 'queued'}), 202
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@upload_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Fetch the status of a queued generation, and the portfolio once done"""
+    job = current_app.extensions['job_queue'].get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    body = {'job_id': job_id, 'status': job['status'], 'attempts': job['attempts']}
+    if job['status'] == 'done':
+        body['success'] = True
+        body['portfolio'] = job['result']
+    elif job['status'] == 'failed':
+        body['error'] = job['error']
+    return jsonify(body), 200
@@ -0,0 +1,23 @@
+from flask import jsonify, current_app
+from app.routes import upload_bp
+from app.services.async_providers import event_loop
+from app.services.extraction import extraction_cache
+from app.services.model_router import model_router
+
+
+@upload_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Load metrics for autoscaling and dashboards
+    Reports per-lane queue depth, wait times and rejections, extraction cache
+    hit/miss counters, generation job queue depth and in-flight jobs, pending
+    progressive upgrades, router stats and async provider loop usage
+    """
+    return jsonify({
+        'admission': current_app.extensions['admission'].stats(),
+        'job_queue': current_app.extensions['job_queue'].stats(),
+        'extraction_cache': extraction_cache.stats(),
+        'progressive': current_app.extensions['progressive'].stats(),
+        'providers': model_router.snapshot(),
+        'async_providers': event_loop.stats()
+    }), 200
@@ -1,8 +1,13 @@
 from flask import request, jsonify, current_app
 from app.routes import upload_bp
-from app.services.llm_service import generate_portfolio
+from app.services.admission import AdmissionGate, AdmissionRejected
+from app.services.extraction import extract_resume_content
+from app.services.llm_service import generate_portfolio, generate_portfolio_template, uses_llm_api
+from app.services.profiling import profile_request, should_profile, stage
+from contextlib import nullcontext
 from werkzeug.utils import secure_filename
 import os
+import time
 
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc', 'txt'}
 
@@ -32,59 +37,78 @@ def upload_resume():
         # Get model and API key from form data
         model = request.form.get('model', 'offline')
         api_key = request.form.get('api_key', '').strip()
+        use_llm = uses_llm_api(model, api_key)
         
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        # Progressive mode: answer with the offline template now, upgrade via /api/upgrade/<id>
+        progressive = use_llm and request.form.get('progressive', '').lower() == 'true'
         
-        # Extract text from resume (placeholder - implement based on file type)
-        resume_text = extract_resume_text(filepath)
+        # Wait for a generation slot, or shed load with 503 + Retry-After
+        gate = current_app.extensions['admission']
+        lane = gate.lane(AdmissionGate.LLM if use_llm and not progressive else AdmissionGate.OFFLINE)
+        try:
+            lane.acquire()
+        except AdmissionRejected as e:
+            response = jsonify({'error': str(e)})
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response, 503
         
-        # Generate portfolio using specified model and API key
-        portfolio_html = generate_portfolio(resume_text, model=model, api_key=api_key)
+        # Opt-in CPU/memory profile of this request (PROFILING_ENABLED + X-Profile header or sampling)
+        profiler = nullcontext()
+        if should_profile(current_app.config, request.headers):
+            profiler = profile_request(current_app.extensions['profiles'], f'upload {file.filename} model={model}')
         
-        # Clean up uploaded file
-        os.remove(filepath)
+        started = time.monotonic()
+        try:
+            with profiler as profile:
+                # Extract text from resume (cached by content hash; the file is saved only on a miss)
+                filename = secure_filename(file.filename)
+                filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+                with stage('extraction'):
+                    resume_text = extract_resume_content(file.read(), filepath)
+                
+                upgrade_id = None
+                if progressive:
+                    with stage('template_render'):
+                        portfolio_html = generate_portfolio_template(resume_text)
+                    upgrade_id = current_app.extensions['progressive'].submit(resume_text, model, api_key)
+                else:
+                    # Generate portfolio using specified model and API key
+                    portfolio_html = generate_portfolio(resume_text, model=model, api_key=api_key)
+        finally:
+            lane.release(time.monotonic() - started)
         
-        return jsonify({
+        body = {
             'success': True,
             'portfolio': portfolio_html,
             'message': 'Portfolio generated successfully'
-        }), 200
+        }
+        if progressive and not upgrade_id:
+            body['busy'] = True
+            body['message'] = 'Template version generated (AI generation busy, try again later)'
+        if upgrade_id:
+            body['preview'] = True
+            body['upgrade_id'] = upgrade_id
+            body['message'] = 'Preview ready, richer version on the way'
+        response = jsonify(body)
+        if profile is not None:
+            response.headers['X-Profile-Id'] = profile.id
+        return response, 200
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-def extract_resume_text(filepath):
-    """Extract text from resume file"""
-    ext = os.path.splitext(filepath)[1].lower()
-    
-    if ext == '.txt':
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return f.read()
-    
-    elif ext == '.pdf':
-        try:
-            import PyPDF2
-            with open(filepath, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                text = ''
-                for page in reader.pages:
-                    text += page.extract_text()
-                return text
-        except ImportError:
-            return "PDF extraction requires PyPDF2. Install with: pip install PyPDF2"
-    
-    elif ext in ['.docx', '.doc']:
-        try:
-            from docx import Document
-            doc = Document(filepath)
-            text = ''
-            for para in doc.paragraphs:
-                text += para.text + '\n'
-            return text
-        except ImportError:
-            return "DOCX extraction requires python-docx. Install with: pip install python-docx"
+
+@upload_bp.route('/upgrade/<upgrade_id>', methods=['GET'])
+def get_upgrade(upgrade_id):
+    """
+    Poll for the LLM version of a progressive upload
+    status: pending | done (portfolio included) | unavailable (keep the preview)
+    """
+    upgrade = current_app.extensions['progressive'].store.get(upgrade_id)
+    if upgrade is None:
+        return jsonify({'error': 'Upgrade not found or expired'}), 404
     
-    return ""
+    body = {'upgrade_id': upgrade_id, 'status': upgrade['status']}
+    if upgrade['portfolio']:
+        body['portfolio'] = upgrade['portfolio']
+    return jsonify(body), 200
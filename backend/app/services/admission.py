@@ -0,0 +1,202 @@
+import asyncio
+import math
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Dict, Optional
+
+
+class AdmissionRejected(Exception):
+    """Raised when a lane's wait queue is full or the wait timed out"""
+
+    def __init__(self, lane: str, retry_after: int):
+        super().__init__(f"Server busy ({lane} lane full), retry in {retry_after}s")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class Lane:
+    """
+    Bounded concurrency slot pool with a bounded wait queue
+
+    At most `max_concurrent` requests run at once; up to `max_queue` more may
+    wait for up to `queue_timeout` seconds. Anything beyond that is rejected
+    immediately so workers stay free to answer health checks.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float,
+                 clock: Callable[[], float] = time.monotonic, smoothing: float = 0.2):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.clock = clock
+        self.smoothing = smoothing
+        self._cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.avg_wait = 0.0
+        self.max_wait = 0.0
+        self.avg_service = 0.0
+
+    def acquire(self) -> float:
+        """Take a slot, waiting in the queue if needed. Returns seconds waited."""
+        with self._cond:
+            started = self.clock()
+            if self.active >= self.max_concurrent:
+                if self.waiting >= self.max_queue:
+                    self.rejected += 1
+                    raise AdmissionRejected(self.name, self.retry_after())
+
+                self.waiting += 1
+                try:
+                    deadline = started + self.queue_timeout
+                    while self.active >= self.max_concurrent:
+                        remaining = deadline - self.clock()
+                        if remaining <= 0:
+                            self.rejected += 1
+                            raise AdmissionRejected(self.name, self.retry_after())
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+
+            waited = self.clock() - started
+            self._admitted(waited)
+            return waited
+
+    def _admitted(self, waited: float) -> None:
+        # Caller holds self._cond
+        self.active += 1
+        self.admitted += 1
+        self.avg_wait = (1 - self.smoothing) * self.avg_wait + self.smoothing * waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def release(self, service_time: Optional[float] = None) -> None:
+        """Give a slot back and wake one waiter"""
+        with self._cond:
+            self.active -= 1
+            if service_time is not None:
+                self.avg_service = ((1 - self.smoothing) * self.avg_service
+                                    + self.smoothing * service_time)
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self):
+        """Context manager holding a slot for the duration of the block"""
+        self.acquire()
+        started = self.clock()
+        try:
+            yield self
+        finally:
+            self.release(self.clock() - started)
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up, for the Retry-After header"""
+        backlog = (self.waiting + 1) / max(1, self.max_concurrent)
+        return max(1, min(60, math.ceil(self.avg_service * backlog)))
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                'active': self.active,
+                'max_concurrent': self.max_concurrent,
+                'queue_depth': self.waiting,
+                'max_queue': self.max_queue,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'avg_wait_seconds': round(self.avg_wait, 3),
+                'max_wait_seconds': round(self.max_wait, 3),
+                'avg_service_seconds': round(self.avg_service, 3),
+            }
+
+
+class AsyncLane(Lane):
+    """
+    Lane for coroutines on the shared event loop (async-mode progressive upgrades)
+
+    admit() never blocks, so request threads can call it before scheduling a
+    coroutine: it reserves a place in the queue, or raises AdmissionRejected
+    once `max_concurrent + max_queue` calls are running or waiting. The
+    coroutine then runs inside `async with lane.slot_async()`, waiting on the
+    loop (not a thread) for up to `queue_timeout` seconds.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loop = None
+        self._slots = None
+
+    def admit(self) -> None:
+        """Reserve a place for a coroutine that will call slot_async()"""
+        with self._cond:
+            if self.active + self.waiting >= self.max_concurrent + self.max_queue:
+                self.rejected += 1
+                raise AdmissionRejected(self.name, self.retry_after())
+            self.waiting += 1
+
+    def withdraw(self) -> None:
+        """Give back an admit() whose coroutine will never run"""
+        with self._cond:
+            self.waiting -= 1
+
+    @asynccontextmanager
+    async def slot_async(self):
+        """Hold a slot for an admitted coroutine for the duration of the block"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A semaphore belongs to one loop; the shared loop is restarted after a fork
+            self._loop, self._slots = loop, asyncio.Semaphore(self.max_concurrent)
+        slots = self._slots
+
+        started = self.clock()
+        try:
+            await asyncio.wait_for(slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            with self._cond:
+                self.waiting -= 1
+                self.rejected += 1
+                raise AdmissionRejected(self.name, self.retry_after())
+        except BaseException:
+            self.withdraw()
+            raise
+
+        with self._cond:
+            self.waiting -= 1
+            self._admitted(self.clock() - started)
+        started = self.clock()
+        try:
+            yield self
+        finally:
+            slots.release()
+            self.release(self.clock() - started)
+
+
+class AdmissionGate:
+    """Separate lanes for cheap offline-template and expensive LLM generations"""
+
+    OFFLINE = 'offline'
+    LLM = 'llm'
+    LLM_ASYNC = 'llm_async'
+
+    def __init__(self, lanes: Dict[str, Lane]):
+        self.lanes = lanes
+
+    @classmethod
+    def from_config(cls, config) -> 'AdmissionGate':
+        timeout = config['ADMISSION_QUEUE_TIMEOUT']
+        return cls({
+            cls.OFFLINE: Lane(cls.OFFLINE, config['ADMISSION_OFFLINE_CONCURRENCY'],
+                              config['ADMISSION_OFFLINE_QUEUE'], timeout),
+            cls.LLM: Lane(cls.LLM, config['ADMISSION_LLM_CONCURRENCY'],
+                          config['ADMISSION_LLM_QUEUE'], timeout),
+            cls.LLM_ASYNC: AsyncLane(cls.LLM_ASYNC, config['ADMISSION_ASYNC_CONCURRENCY'],
+                                     config['ADMISSION_ASYNC_QUEUE'], timeout),
+        })
+
+    def lane(self, name: str) -> Lane:
+        return self.lanes[name]
+
+    def stats(self) -> Dict[str, Dict]:
+        return {name: lane.stats() for name, lane in self.lanes.items()}
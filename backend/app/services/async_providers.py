@@ -0,0 +1,188 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Optional
+
+from app.services.llm_service import (
+    REQUEST_TIMEOUT, Provider, check_response, document_steps, finish_generation, plan_generation,
+    request_timeout, resolve_provider
+)
+from app.services.profiling import stage
+from app.services.retry import (
+    ProviderError, RetryableError, call_with_retry_async, generation_deadline, is_client_error, time_left
+)
+
+
+class EventLoopThread:
+    """
+    One asyncio event loop in a daemon thread, shared by the whole process
+
+    Sync code (Flask views, worker threads) hands coroutines to it with run()
+    or submit(). Provider calls made on the loop share one pooled httpx client
+    (HTTP/2 when the h2 package is installed), so an in-flight generation
+    costs a coroutine and a stream instead of an OS thread and a socket.
+    The loop starts lazily, and again in a forked child.
+    """
+
+    def __init__(self, max_connections: Optional[int] = None):
+        self.max_connections = max_connections or int(os.getenv('ASYNC_HTTP_MAX_CONNECTIONS', 100))
+        self.http2 = os.getenv('ASYNC_HTTP2', 'true').lower() == 'true'
+        self.inflight = 0
+        self._lock = threading.Lock()
+        self._loop = None
+        self._pid = None
+        self._client = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._start()
+            return self._loop
+
+    def submit(self, coro) -> Future:
+        """Schedule a coroutine on the loop from any thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the loop and block the calling thread until it finishes"""
+        return self.submit(coro).result(timeout)
+
+    @property
+    def client(self):
+        """Pooled httpx.AsyncClient; only use it from coroutines running on the loop"""
+        if self._client is None:
+            import httpx
+
+            http2 = self.http2
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    print("h2 not installed, async providers fall back to HTTP/1.1")
+                    http2 = False
+            self._client = httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+                timeout=httpx.Timeout(60.0, connect=10.0)
+            )
+        return self._client
+
+    def stats(self) -> Dict:
+        return {
+            'running': self._loop is not None,
+            'inflight': self.inflight,
+            'max_connections': self.max_connections,
+        }
+
+    def _start(self) -> None:
+        # Caller holds self._lock. After a fork the parent's loop thread is gone,
+        # and its client belongs to that loop, so start fresh.
+        self._loop = asyncio.new_event_loop()
+        self._pid = os.getpid()
+        self._client = None
+        threading.Thread(target=self._loop.run_forever, name='llm-event-loop', daemon=True).start()
+
+
+# Process-wide loop used by llm_service (ASYNC_PROVIDERS=true) and progressive mode
+event_loop = EventLoopThread()
+
+
+async def generate_portfolio_llm_async(resume_text: str, model: Optional[str] = None,
+                                       api_key: Optional[str] = None) -> Optional[str]:
+    """Coroutine version of generate_portfolio_llm, for callers already on the loop"""
+    plan = plan_generation(resume_text, model, api_key)
+    if plan is None:
+        return None
+
+    started = time.monotonic()
+    html = None
+    client_error = False
+    try:
+        html = await call_llm_api_async(resume_text, plan.model, plan.api_key, plan.max_tokens,
+                                        plan.prompt, plan.end_marker)
+    except ProviderError as e:
+        print(f"LLM API rejected the request: {e}. Using offline template.")
+        client_error = True
+    except Exception as e:
+        print(f"LLM API error: {e}. Using offline template.")
+
+    return finish_generation(plan, resume_text, html, time.monotonic() - started, client_error)
+
+
+async def call_llm_api_async(resume_text: str, model: str, api_key: Optional[str] = None,
+                             max_tokens: int = 4096, prompt: Optional[str] = None,
+                             end_marker: str = '</html>') -> Optional[str]:
+    """Async call_llm_api: same model dispatch, over the shared loop's transports"""
+    provider = resolve_provider(model)
+    if provider is None:
+        return None
+    event_loop.inflight += 1
+    try:
+        return await call_provider_async(provider, resume_text, model, api_key, max_tokens, prompt, end_marker)
+    finally:
+        event_loop.inflight -= 1
+
+
+async def call_provider_async(provider: Provider, resume_text: str, model: str,
+                              api_key: Optional[str] = None, max_tokens: int = 4096,
+                              prompt: Optional[str] = None, end_marker: str = '</html>') -> Optional[str]:
+    """llm_service.call_provider over the pooled httpx client and the SDKs' async clients"""
+    try:
+        deadline = generation_deadline()
+        api_key = api_key or os.getenv(provider.env_key)
+        if not api_key:
+            print(f"{provider.env_key} not set")
+            return None
+
+        with stage('prompt_build'):
+            prompt = prompt or provider.prompt(resume_text)
+        create = provider.client(api_key, model, http_client=event_loop.client) if provider.client else None
+
+        async def send(messages, max_tokens):
+            request = provider.request(api_key, model, messages, max_tokens)
+            timeout = request_timeout(deadline)
+            if create is None:
+                return provider.parse(await post_json_async(*request, provider=provider.name,
+                                                            timeout=min(timeout, REQUEST_TIMEOUT)))
+            return provider.parse(await create(**request, timeout=timeout))
+
+        return await complete_document_async(send, prompt, max_tokens, end_marker=end_marker,
+                                             deadline=deadline)
+    except Exception as e:
+        print(f"{provider.name} error: {e}")
+        if is_client_error(e):
+            raise ProviderError(str(e)) from e
+        return None
+
+
+async def post_json_async(url: str, headers: dict, payload: dict, provider: str,
+                          timeout: float = REQUEST_TIMEOUT) -> dict:
+    """post_json on the pooled client, same RetryableError/ProviderError contract"""
+    import httpx
+
+    try:
+        response = await event_loop.client.post(url, headers=headers, json=payload, timeout=timeout)
+    except httpx.TransportError as e:
+        raise RetryableError(f"{provider} error: {type(e).__name__} {e}")
+    return check_response(response.status_code, response.text, response.headers, provider,
+                          response.json)
+
+
+async def complete_document_async(send, prompt: str, max_tokens: int,
+                                  max_continuations: Optional[int] = None,
+                                  end_marker: str = '</html>',
+                                  deadline: Optional[float] = None) -> Optional[str]:
+    """complete_document for an async `send(messages, max_tokens)`"""
+    steps = document_steps(prompt, max_continuations, end_marker, lambda: time_left(deadline) == 0)
+    messages = next(steps)
+    while True:
+        with stage('provider_call'):
+            reply = await call_with_retry_async(send, messages, max_tokens, deadline=deadline)
+        try:
+            messages = steps.send(reply)
+        except StopIteration as done:
+            return done.value
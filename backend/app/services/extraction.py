@@ -0,0 +1,171 @@
+import os
+import zipfile
+import xml.etree.ElementTree as ET
+
+
+from app.services.extraction_cache import ExtractionCache
+
+
+# WordprocessingML namespace used in word/document.xml
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+# Markup-compatibility namespace (mc:AlternateContent wraps text boxes)
+MC = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+
+# Bump whenever extraction output changes, so cached text is not reused
+EXTRACTOR_VERSION = 3
+
+# Process-wide cache of extracted text, keyed by upload content hash
+extraction_cache = ExtractionCache(
+    max_bytes=int(float(os.getenv('EXTRACTION_CACHE_MB', 64)) * 1024 * 1024),
+    version=EXTRACTOR_VERSION
+)
+
+
+def extract_resume_content(content: bytes, filepath: str) -> str:
+    """
+    Extract text from uploaded resume bytes, using the extraction cache
+    
+    Only a cache miss writes the bytes to `filepath` and parses them; the
+    file is removed afterwards either way.
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+    
+    def extract():
+        with open(filepath, 'wb') as f:
+            f.write(content)
+        try:
+            return extract_resume_text(filepath)
+        finally:
+            os.remove(filepath)
+    
+    return extraction_cache.get_or_extract(content, ext, extract)
+
+
+def extract_resume_text(filepath):
+    """Extract text from resume file"""
+    ext = os.path.splitext(filepath)[1].lower()
+    
+    if ext == '.txt':
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return f.read()
+    
+    elif ext == '.pdf':
+        try:
+            import PyPDF2
+            with open(filepath, 'rb') as f:
+                reader = PyPDF2.PdfReader(f)
+                text = ''
+                for page in reader.pages:
+                    text += page.extract_text()
+                return text
+        except ImportError:
+            return "PDF extraction requires PyPDF2. Install with: pip install PyPDF2"
+    
+    elif ext in ['.docx', '.doc']:
+        try:
+            return extract_docx_text(filepath)
+        except (zipfile.BadZipFile, KeyError, ET.ParseError):
+            # Not a well-formed OOXML package (e.g. legacy .doc); let python-docx try
+            return extract_docx_text_python_docx(filepath)
+    
+    return ""
+
+
+def extract_docx_text(filepath):
+    """
+    Extract DOCX text by streaming word/document.xml
+
+    Skips the python-docx object model (styles, numbering, sections) and keeps
+    memory flat regardless of document size. Paragraphs and table cells are
+    emitted in reading order; each table row becomes one line with cells
+    separated by ' | '.
+    """
+    with zipfile.ZipFile(filepath) as package:
+        with package.open('word/document.xml') as xml:
+            return ''.join(line + '\n' for line in iter_docx_lines(xml))
+
+
+def iter_docx_lines(xml_stream):
+    """Yield the text lines of a document.xml stream"""
+    paragraphs = []  # stack of text parts per open <w:p> (text boxes nest paragraphs)
+    rows = []        # stack of cell lists per open <w:tr> (tables can nest)
+    cells = []       # stack of paragraph lists per open <w:tc>
+    runs = []        # open <w:r> count per open <w:p>; <w:tab> outside a run is a tab stop
+    fallback = 0     # open <mc:Fallback> elements; they repeat the <mc:Choice> text
+    depth = 0
+    body = None
+
+    for event, elem in ET.iterparse(xml_stream, events=('start', 'end')):
+        tag = elem.tag
+
+        if event == 'start':
+            depth += 1
+            if tag == MC + 'Fallback':
+                fallback += 1
+            elif fallback:
+                pass
+            elif tag == W + 'p':
+                paragraphs.append([])
+                runs.append(0)
+            elif tag == W + 'r' and runs:
+                runs[-1] += 1
+            elif tag == W + 'tr':
+                rows.append([])
+            elif tag == W + 'tc':
+                cells.append([])
+            elif tag == W + 'body':
+                body = elem
+            continue
+
+        depth -= 1
+        if tag == MC + 'Fallback':
+            fallback -= 1
+        elif fallback:
+            pass
+        elif tag == W + 't' and paragraphs:
+            paragraphs[-1].append(elem.text or '')
+        elif tag == W + 'tab' and runs and runs[-1]:
+            paragraphs[-1].append('\t')
+        elif tag in (W + 'br', W + 'cr') and paragraphs:
+            paragraphs[-1].append('\n')
+        elif tag == W + 'r' and runs:
+            runs[-1] -= 1
+        elif tag == W + 'p':
+            runs.pop()
+            text = ''.join(paragraphs.pop())
+            if paragraphs:
+                # Text-box paragraph: keep it on its own line within the host paragraph
+                if paragraphs[-1]:
+                    paragraphs[-1].append('\n')
+                paragraphs[-1].append(text)
+            elif cells:
+                cells[-1].append(text)
+            else:
+                yield text
+        elif tag == W + 'tc':
+            text = ' '.join(p.strip() for p in cells.pop() if p.strip())
+            if rows:
+                rows[-1].append(text)
+        elif tag == W + 'tr':
+            line = ' | '.join(c for c in rows.pop() if c)
+            if cells:
+                cells[-1].append(line)
+            elif line:
+                yield line
+
+        # Drop finished top-level blocks so the tree never grows past one block
+        if depth == 2 and body is not None:
+            body.clear()
+
+
+def extract_docx_text_python_docx(filepath):
+    """Extract DOCX paragraph text through python-docx (slower, ignores tables)"""
+    try:
+        from docx import Document
+        doc = Document(filepath)
+        text = ''
+        for para in doc.paragraphs:
+            text += para.text + '\n'
+        return text
+    except ImportError:
+        return "DOCX extraction requires python-docx. Install with: pip install python-docx"
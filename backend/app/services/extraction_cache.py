@@ -0,0 +1,75 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+
+class ExtractionCache:
+    """
+    LRU cache of extracted resume text, bounded by memory size
+
+    Keyed by a SHA-256 of the uploaded bytes plus the file extension and the
+    extractor version, so re-uploads of the same file skip parsing and a
+    change to the extractors invalidates old entries.
+    """
+
+    def __init__(self, max_bytes: int, version: int):
+        self.max_bytes = max_bytes
+        self.version = version
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, content: bytes, ext: str) -> str:
+        return f'{self.version}:{ext}:{hashlib.sha256(content).hexdigest()}'
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._entries.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key: str, text: str) -> None:
+        cost = sys.getsizeof(text)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= sys.getsizeof(old)
+            self._entries[key] = text
+            self.size += cost
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= sys.getsizeof(evicted)
+                self.evictions += 1
+
+    def get_or_extract(self, content: bytes, ext: str, extract: Callable[[], str]) -> str:
+        """Return cached text for these bytes, or run `extract` and cache its result"""
+        key = self.key(content, ext)
+        text = self.get(key)
+        if text is None:
+            text = extract()
+            self.put(key, text)
+        return text
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'size_bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,68 @@
+import base64
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+from app.services.extraction import extract_resume_content
+from app.services.job_queue import Job, JobQueue
+from app.services.llm_service import generate_portfolio
+
+
+def build_job_payload(filename: str, content: bytes, model: str, api_key: str = '') -> Dict:
+    """Job payload for a resume upload (file bytes travel with the job)"""
+    return {
+        'filename': filename,
+        'content': base64.b64encode(content).decode('ascii'),
+        'model': model,
+        'api_key': api_key,
+    }
+
+
+def process_job(job: Job) -> str:
+    """Extract the resume carried by a job and generate its portfolio HTML"""
+    payload = job.payload
+    ext = os.path.splitext(payload['filename'])[1].lower()
+
+    fd, filepath = tempfile.mkstemp(suffix=ext)
+    os.close(fd)
+    try:
+        resume_text = extract_resume_content(base64.b64decode(payload['content']), filepath)
+    finally:
+        # Cache hits never touch the file, and a bad payload fails before extraction runs
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+    return generate_portfolio(resume_text, model=payload.get('model'), api_key=payload.get('api_key'))
+
+
+def run_worker(queue: JobQueue, visibility_timeout: float = 300, poll_interval: float = 1.0,
+               stop_event: Optional[threading.Event] = None, max_jobs: Optional[int] = None) -> int:
+    """
+    Consume generation jobs until stopped
+
+    Returns the number of jobs processed. A job that raises is marked failed;
+    a worker that dies mid-job leaves it to be redelivered after the
+    visibility timeout.
+    """
+    stop_event = stop_event or threading.Event()
+    processed = 0
+
+    while not stop_event.is_set() and (max_jobs is None or processed < max_jobs):
+        job = queue.dequeue(visibility_timeout)
+        if job is None:
+            stop_event.wait(poll_interval)
+            continue
+
+        started = time.monotonic()
+        try:
+            result = process_job(job)
+            queue.complete(job.id, result)
+            print(f"Job {job.id} done in {time.monotonic() - started:.2f}s (attempt {job.attempts})")
+        except Exception as e:
+            queue.fail(job.id, str(e))
+            print(f"Job {job.id} failed: {e}")
+        processed += 1
+
+    return processed
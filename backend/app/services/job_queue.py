@@ -0,0 +1,360 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+@dataclass
+class Job:
+    """A generation job handed to a worker"""
+    id: str
+    payload: Dict
+    attempts: int
+
+
+class JobQueue(ABC):
+    """
+    Queue of generation jobs shared by the web tier and the workers
+
+    Delivery is at-least-once: a dequeued job stays invisible for
+    `visibility_timeout` seconds and is handed out again if the worker doesn't
+    complete or fail it in time (e.g. the worker pod died). Jobs that keep
+    coming back are marked failed after `max_attempts` deliveries.
+    """
+
+    @abstractmethod
+    def enqueue(self, payload: Dict) -> str:
+        """Add a job and return its id"""
+
+    @abstractmethod
+    def dequeue(self, visibility_timeout: float) -> Optional[Job]:
+        """Claim the next visible job, or None if there is nothing to do"""
+
+    @abstractmethod
+    def complete(self, job_id: str, result: str) -> None:
+        """Mark a job done with its result"""
+
+    @abstractmethod
+    def fail(self, job_id: str, error: str) -> None:
+        """Mark a job failed"""
+
+    @abstractmethod
+    def track(self) -> str:
+        """
+        Create a running job for work done outside the workers (progressive upgrades)
+
+        It is never handed out by dequeue; its owner completes or fails it, and
+        any process sharing the queue can read it with get().
+        """
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Job status for the web tier: status, result, error, attempts"""
+
+    @abstractmethod
+    def stats(self) -> Dict:
+        """Queue depth and in-flight count, for autoscaling the worker tier"""
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    SQLite-backed queue for local development and tests (':memory:' for in-process use)
+
+    Like the Redis queue, finished jobs are deleted `result_ttl` seconds after
+    they finish, and tracked jobs whose owner never finished them
+    `result_ttl` seconds after they were created. Finished rows keep their
+    finish time in visible_at, which dequeue no longer looks at.
+    """
+
+    # Seconds between purges of expired rows
+    PURGE_INTERVAL = 60
+
+    def __init__(self, path: str = ':memory:', max_attempts: int = 3,
+                 result_ttl: int = 24 * 60 * 60, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.result_ttl = result_ttl
+        self.clock = clock
+        self._purged_at = float('-inf')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                payload TEXT,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                visible_at REAL NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, visible_at)")
+
+    def enqueue(self, payload: Dict) -> str:
+        job_id = uuid.uuid4().hex
+        now = self.clock()
+        with self._lock:
+            self._purge(now)
+            self._conn.execute(
+                "INSERT INTO jobs (id, payload, status, visible_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, json.dumps(payload), QUEUED, now, now)
+            )
+        return job_id
+
+    def track(self) -> str:
+        job_id = uuid.uuid4().hex
+        now = self.clock()
+        with self._lock:
+            # Never visible, so dequeue can't pick up the payload-less row
+            self._conn.execute(
+                "INSERT INTO jobs (id, payload, status, visible_at, created_at) VALUES (?, NULL, ?, ?, ?)",
+                (job_id, RUNNING, float('inf'), now)
+            )
+        return job_id
+
+    def dequeue(self, visibility_timeout: float) -> Optional[Job]:
+        now = self.clock()
+        with self._lock:
+            self._purge(now)
+            # BEGIN IMMEDIATE takes the write lock so two workers can't claim the same row
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = self._conn.execute(
+                        "SELECT id, payload, attempts FROM jobs "
+                        "WHERE status IN (?, ?) AND visible_at <= ? "
+                        "ORDER BY created_at LIMIT 1",
+                        (QUEUED, RUNNING, now)
+                    ).fetchone()
+                    if row is None:
+                        self._conn.execute("COMMIT")
+                        return None
+
+                    if row['attempts'] >= self.max_attempts:
+                        self._conn.execute(
+                            "UPDATE jobs SET status = ?, payload = NULL, error = ?, visible_at = ? WHERE id = ?",
+                            (FAILED, 'Exceeded max delivery attempts', now, row['id'])
+                        )
+                        continue
+
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, attempts = attempts + 1, visible_at = ? WHERE id = ?",
+                        (RUNNING, now + visibility_timeout, row['id'])
+                    )
+                    self._conn.execute("COMMIT")
+                    return Job(row['id'], json.loads(row['payload']), row['attempts'] + 1)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def complete(self, job_id: str, result: str) -> None:
+        # The payload (uploaded file, API key) is dropped once the job is finished
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, payload = NULL, visible_at = ? WHERE id = ?",
+                (DONE, result, self.clock(), job_id)
+            )
+
+    def fail(self, job_id: str, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, payload = NULL, visible_at = ? WHERE id = ?",
+                (FAILED, error, self.clock(), job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, result, error, attempts FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def stats(self) -> Dict:
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT "
+                "SUM(status = ? OR (status = ? AND visible_at <= ?)), "
+                "SUM(status = ? AND visible_at > ? AND payload IS NOT NULL), "
+                "SUM(status = ? AND payload IS NULL) "
+                "FROM jobs",
+                (QUEUED, RUNNING, now, RUNNING, now, RUNNING)
+            ).fetchone()
+        return {'queued': row[0] or 0, 'inflight': row[1] or 0, 'tracked': row[2] or 0}
+
+    def _purge(self, now: float) -> None:
+        # Caller holds self._lock
+        if now - self._purged_at < self.PURGE_INTERVAL:
+            return
+        self._purged_at = now
+        cutoff = now - self.result_ttl
+        self._conn.execute(
+            "DELETE FROM jobs WHERE (status IN (?, ?) AND visible_at <= ?) "
+            "OR (status = ? AND payload IS NULL AND created_at <= ?)",
+            (DONE, FAILED, cutoff, RUNNING, cutoff)
+        )
+
+
+# Atomically claim the next job: pop its id, mark it in flight until ARGV[1] and
+# bump its attempts. Ids whose job hash (prefix ARGV[2]) has expired or was
+# already finished are dropped here, so HINCRBY never recreates a hash without a TTL.
+_DEQUEUE_SCRIPT = """
+while true do
+    local id = redis.call('RPOP', KEYS[1])
+    if not id then return nil end
+    local key = ARGV[2] .. id
+    local payload = redis.call('HGET', key, 'payload')
+    if payload then
+        redis.call('ZADD', KEYS[2], ARGV[1], id)
+        local attempts = redis.call('HINCRBY', key, 'attempts', 1)
+        redis.call('HSET', key, 'status', ARGV[3])
+        return {id, attempts, payload}
+    end
+end
+"""
+
+# Move jobs whose visibility timeout expired back onto the queue
+_RECLAIM_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for _, id in ipairs(ids) do
+    redis.call('ZREM', KEYS[2], id)
+    redis.call('RPUSH', KEYS[1], id)
+end
+return #ids
+"""
+
+
+class RedisJobQueue(JobQueue):
+    """
+    Redis-compatible queue for production (works with Redis, Valkey, KeyDB, ...)
+
+    Pending job ids live in a list, in-flight ids in a sorted set scored by
+    their visibility deadline, and job state in one hash per job. Finished
+    jobs expire after `result_ttl` seconds.
+    """
+
+    def __init__(self, url: str, prefix: str = 'r2p:jobs', max_attempts: int = 3,
+                 result_ttl: int = 24 * 60 * 60, clock: Callable[[], float] = time.time,
+                 client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("Redis job queue requires redis. Install with: pip install redis")
+            client = redis.Redis.from_url(url, decode_responses=True)
+
+        self.redis = client
+        self.prefix = prefix
+        self.max_attempts = max_attempts
+        self.result_ttl = result_ttl
+        self.clock = clock
+        self._queue_key = f'{prefix}:queue'
+        self._inflight_key = f'{prefix}:inflight'
+        self._dequeue = self.redis.register_script(_DEQUEUE_SCRIPT)
+        self._reclaim = self.redis.register_script(_RECLAIM_SCRIPT)
+
+    def _job_key(self, job_id: str) -> str:
+        return f'{self.prefix}:job:{job_id}'
+
+    def enqueue(self, payload: Dict) -> str:
+        job_id = uuid.uuid4().hex
+        pipe = self.redis.pipeline()
+        pipe.hset(self._job_key(job_id), mapping={
+            'payload': json.dumps(payload),
+            'status': QUEUED,
+            'attempts': 0,
+        })
+        pipe.lpush(self._queue_key, job_id)
+        pipe.execute()
+        return job_id
+
+    def track(self) -> str:
+        # Not pushed onto the queue list; expires like a finished job if never finished
+        job_id = uuid.uuid4().hex
+        key = self._job_key(job_id)
+        pipe = self.redis.pipeline()
+        pipe.hset(key, mapping={'status': RUNNING, 'attempts': 0})
+        pipe.expire(key, self.result_ttl)
+        pipe.execute()
+        return job_id
+
+    def dequeue(self, visibility_timeout: float) -> Optional[Job]:
+        now = self.clock()
+        self._reclaim(keys=[self._queue_key, self._inflight_key], args=[now])
+
+        while True:
+            claimed = self._dequeue(keys=[self._queue_key, self._inflight_key],
+                                    args=[now + visibility_timeout, self._job_key(''), RUNNING])
+            if claimed is None:
+                return None
+
+            job_id, attempts, payload = claimed[0], int(claimed[1]), claimed[2]
+            if attempts > self.max_attempts:
+                self.fail(job_id, 'Exceeded max delivery attempts')
+                continue
+            return Job(job_id, json.loads(payload), attempts)
+
+    def _finish(self, job_id: str, fields: Dict) -> None:
+        key = self._job_key(job_id)
+        pipe = self.redis.pipeline()
+        pipe.hset(key, mapping=fields)
+        pipe.hdel(key, 'payload')
+        pipe.zrem(self._inflight_key, job_id)
+        pipe.expire(key, self.result_ttl)
+        pipe.execute()
+
+    def complete(self, job_id: str, result: str) -> None:
+        self._finish(job_id, {'status': DONE, 'result': result})
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._finish(job_id, {'status': FAILED, 'error': error})
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        data = self.redis.hgetall(self._job_key(job_id))
+        if not data:
+            return None
+        return {
+            'status': data.get('status'),
+            'result': data.get('result'),
+            'error': data.get('error'),
+            'attempts': int(data.get('attempts', 0)),
+        }
+
+    def stats(self) -> Dict:
+        # Tracked jobs live only in their hashes, so they aren't counted here
+        pipe = self.redis.pipeline()
+        pipe.llen(self._queue_key)
+        pipe.zcard(self._inflight_key)
+        queued, inflight = pipe.execute()
+        return {'queued': queued, 'inflight': inflight}
+
+
+def get_job_queue(url: str, max_attempts: int = 3, result_ttl: int = 24 * 60 * 60) -> JobQueue:
+    """
+    Build a queue from a URL
+
+    sqlite:///path/to/jobs.db  - SQLite file shared by local web + worker processes
+    memory://                  - in-process SQLite (single process, tests)
+    redis://host:6379/0        - Redis-compatible server (also rediss://)
+    """
+    if url.startswith('memory://'):
+        return SQLiteJobQueue(':memory:', max_attempts=max_attempts, result_ttl=result_ttl)
+    if url.startswith('sqlite:///'):
+        return SQLiteJobQueue(url[len('sqlite:///'):], max_attempts=max_attempts, result_ttl=result_ttl)
+    if url.startswith(('redis://', 'rediss://')):
+        return RedisJobQueue(url, max_attempts=max_attempts, result_ttl=result_ttl)
+    raise ValueError(f"Unsupported JOB_QUEUE_URL: {url}")
@@ -1,5 +1,22 @@
 import os
-from typing import Optional
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Generator, Optional, Tuple
+
+from app.services.model_router import model_router, content_budget, estimate_tokens
+from app.services.profiling import stage
+from app.services.themes import (
+    TEMPLATE_CSS, Theme, build_content_prompt, build_design_prompt, extract_content, render_theme, theme_library
+)
+from app.services.retry import (
+    ProviderError, RetryableError, RETRYABLE_STATUS, call_with_retry, generation_deadline, is_client_error,
+    parse_retry_after, time_left
+)
+
+# One provider reply: (text, finish_reason)
+Reply = Tuple[Optional[str], Optional[str]]
+# A REST provider request for post_json: (url, headers, payload)
+RestRequest = Tuple[str, dict, dict]
 
 
 def generate_portfolio(resume_text: str, model: Optional[str] = None, api_key: Optional[str] = None) -> str:
@@ -7,6 +24,7 @@ def generate_portfolio(resume_text: str, model: Optional[str] = None, api_key: O
     Generate portfolio HTML from resume text using configured LLM
     
     Supports: Claude, Gemini, GPT, Llama, Qwen, Groq, and more!
+    Use model='auto' to let the router pick a provider.
     
     Args:
         resume_text: Extracted text from resume
@@ -17,65 +35,240 @@ def generate_portfolio(resume_text: str, model: Optional[str] = None, api_key: O
         HTML string for portfolio website
     """
     
+    html = generate_portfolio_llm(resume_text, model, api_key)
+    if html:
+        return html
+    
+    # Otherwise use template mode
+    with stage('template_render'):
+        return generate_portfolio_template(resume_text)
+
+
+def generate_portfolio_llm(resume_text: str, model: Optional[str] = None,
+                           api_key: Optional[str] = None) -> Optional[str]:
+    """
+    LLM half of generate_portfolio: returns None instead of falling back to the template
+    
+    Used directly by progressive mode, where the template has already been sent.
+    With ASYNC_PROVIDERS=true the provider call runs on the shared event loop
+    (app/services/async_providers.py) and this thread just waits for it.
+    """
+    
+    plan = plan_generation(resume_text, model, api_key)
+    if plan is None:
+        return None
+    
+    started = time.monotonic()
+    html = None
+    client_error = False
+    try:
+        if uses_async_providers():
+            from app.services.async_providers import call_llm_api_async, event_loop
+            html = event_loop.run(call_llm_api_async(
+                resume_text, plan.model, plan.api_key, plan.max_tokens, plan.prompt, plan.end_marker
+            ))
+        else:
+            html = call_llm_api(resume_text, plan.model, plan.api_key, plan.max_tokens,
+                                plan.prompt, plan.end_marker)
+    except ProviderError as e:
+        print(f"LLM API rejected the request: {e}. Using offline template.")
+        client_error = True
+    except Exception as e:
+        print(f"LLM API error: {e}. Using offline template.")
+    
+    return finish_generation(plan, resume_text, html, time.monotonic() - started, client_error)
+
+
+@dataclass
+class GenerationPlan:
+    """Provider call worked out by plan_generation (model routing + theme library)"""
+    model: str
+    api_key: Optional[str]
+    max_tokens: int = 4096
+    prompt: Optional[str] = None
+    end_marker: str = '</html>'
+    theme: Optional[Theme] = None
+    reserved: int = 0  # router quota reservation, settled by finish_generation
+
+
+def plan_generation(resume_text: str, model: Optional[str] = None,
+                    api_key: Optional[str] = None) -> Optional[GenerationPlan]:
+    """Decide model, output budget and prompt for an LLM generation, None if offline"""
+    
     # Get model configuration
     configured_model = model or os.getenv('LLM_MODEL', 'offline')
     
-    # Determine if we should use API (if model is not offline or api_key is provided)
-    if api_key or (configured_model != 'offline' and os.getenv('USE_LLM_API', 'false').lower() == 'true'):
-        try:
-            html = call_llm_api(resume_text, configured_model, api_key)
-            if html:
-                return html
-        except Exception as e:
-            print(f"LLM API error: {e}. Using offline template.")
+    if not uses_llm_api(configured_model, api_key):
+        return None
     
-    # Otherwise use template mode
-    return generate_portfolio_template(resume_text)
+    plan = GenerationPlan(configured_model, api_key)
+    if configured_model == 'auto':
+        route = model_router.choose(resume_text, api_key)
+        if route is None:
+            print("Model router: no provider available. Using offline template.")
+            return None
+        plan.model, plan.max_tokens, plan.reserved = route.model, route.max_tokens, route.reserved
+        print(f"Model router picked {plan.model} (max_tokens={plan.max_tokens})")
+    
+    # Theme library: usually ask only for content markup and wrap it in a cached
+    # CSS shell; a share of requests still asks for a full design to harvest
+    if theme_library.enabled:
+        if theme_library.should_explore():
+            plan.prompt = build_design_prompt(resume_text)
+        else:
+            plan.theme = theme_library.choose()
+            plan.prompt = build_content_prompt(resume_text, plan.theme)
+            plan.end_marker = '</main>'
+            plan.max_tokens = min(plan.max_tokens, content_budget(resume_text))
+    return plan
 
 
-def call_llm_api(resume_text: str, model: str, api_key: Optional[str] = None) -> Optional[str]:
+def finish_generation(plan: GenerationPlan, resume_text: str, html: Optional[str],
+                      elapsed: float, client_error: bool = False) -> Optional[str]:
     """
-    Call various LLM APIs based on model selection
+    Record the outcome with the router and turn the reply into the final page
+
+    `client_error` (the provider rejected our key or request) isn't recorded,
+    so one user's bad key doesn't steer routing away from a healthy provider.
+    """
+    if client_error:
+        model_router.release(plan.model, plan.reserved)
+    else:
+        tokens = estimate_tokens(resume_text) + (estimate_tokens(html) if html else 0)
+        model_router.record(plan.model, elapsed, bool(html), tokens, plan.reserved)
     
+    if html and plan.theme is not None:
+        content = extract_content(html)
+        if not content:
+            print("LLM reply had no <main> content. Using offline template.")
+            return None
+        with stage('template_render'):
+            return render_theme(plan.theme, content)
+    if html and plan.prompt is not None:
+        theme_library.save_design(html)
+    return html or None
+
+
+def uses_llm_api(model: Optional[str] = None, api_key: Optional[str] = None) -> bool:
+    """Whether a request will call an LLM API (if model is not offline or api_key is provided)"""
+    configured_model = model or os.getenv('LLM_MODEL', 'offline')
+    return bool(api_key) or (configured_model != 'offline' and os.getenv('USE_LLM_API', 'false').lower() == 'true')
+
+
+def uses_async_providers() -> bool:
+    """Whether provider calls go through the shared asyncio loop (ASYNC_PROVIDERS=true)"""
+    return os.getenv('ASYNC_PROVIDERS', 'false').lower() == 'true'
+
+
+def call_llm_api(resume_text: str, model: str, api_key: Optional[str] = None,
+                 max_tokens: int = 4096, prompt: Optional[str] = None,
+                 end_marker: str = '</html>') -> Optional[str]:
+    """
+    Call various LLM APIs based on model selection
+
     Supported providers:
     - Euron.ai: euron:gpt-4.1-nano, euron:gpt-4.1-mini (FREE - 10k tokens/day!)
     - Google: gemini-2.5-flash, gemini-2.5-pro, gemini-2.0-flash
     - OpenAI: gpt-5-mini, gpt-5-nano, gpt-4.1-mini
-    - Meta: llama-3.3-70b, llama-4-scout, llama-4-maverick  
+    - Meta: llama-3.3-70b, llama-4-scout, llama-4-maverick
     - Groq: groq/compound, groq/compound-mini
     - Alibaba: qwen/qwen3-32b
+
+    `prompt` replaces the provider's built-in full-design prompt (theme
+    library modes); `end_marker` is the closing tag used to spot truncation.
     """
-    
+
+    provider = resolve_provider(model)
+    if provider is None:
+        return None
+    return call_provider(provider, resume_text, model, api_key, max_tokens, prompt, end_marker)
+
+
+def resolve_provider(model: str) -> Optional['Provider']:
+    """Provider serving a model string (Llama models go to Together AI or Groq)"""
     if model.startswith('euron'):
-        return call_euron_ai(resume_text, model, api_key)
+        return EURON
     elif model.startswith('gemini'):
-        return call_google_gemini(resume_text, model, api_key)
+        return GEMINI
     elif model.startswith('gpt'):
-        return call_openai(resume_text, model, api_key)
+        return OPENAI
     elif model.startswith('llama') or 'llama' in model:
-        return call_llama_model(resume_text, model, api_key)
+        return llama_provider(model)
     elif model.startswith('qwen'):
-        return call_alibaba(resume_text, model, api_key)
+        return ALIBABA
     elif model.startswith('groq'):
-        return call_groq(resume_text, model, api_key)
-    
+        return GROQ
     return None
 
 
-def call_euron_ai(resume_text: str, model: str, api_key: Optional[str] = None) -> Optional[str]:
-    """Call Euron.ai API (OpenAI-compatible, FREE 10k tokens/day)"""
+@dataclass
+class Provider:
+    """
+    How to talk to one LLM provider, shared by the sync and async call paths
+
+    `request(api_key, model, messages, max_tokens)` builds one request and
+    `parse(reply)` returns (text, finish_reason). REST providers' requests are
+    (url, headers, payload) tuples for post_json; SDK providers also have
+    `client(api_key, model, http_client=None)` returning the SDK call that
+    takes the request and a `timeout` as keyword arguments (the async variant
+    on the shared pool when given an http_client).
+    """
+    name: str
+    env_key: str
+    prompt: Callable[[str], str]
+    request: Callable[..., Any]
+    parse: Callable[[Any], Reply]
+    client: Optional[Callable[..., Callable]] = None
+
+
+def call_provider(provider: Provider, resume_text: str, model: str, api_key: Optional[str] = None,
+                  max_tokens: int = 4096, prompt: Optional[str] = None,
+                  end_marker: str = '</html>') -> Optional[str]:
+    """
+    Generate with one provider over the blocking transports (requests, sync SDKs)
+
+    Returns None on failure, except that a rejected request (bad key, bad
+    request) is raised as ProviderError so it isn't held against the provider.
+    All requests, retries and continuations share one LLM_TOTAL_TIMEOUT budget.
+    async_providers.call_provider_async is the same on the shared event loop.
+    """
     try:
-        import requests
-        
-        api_key = api_key or os.getenv('EURON_API_KEY')
+        deadline = generation_deadline()
+        api_key = api_key or os.getenv(provider.env_key)
         if not api_key:
-            print("EURON_API_KEY not set")
+            print(f"{provider.env_key} not set")
             return None
-        
-        # Extract model name (format: euron:gpt-4.1-nano)
-        model_name = model.split(':')[1] if ':' in model else model
-        
-        prompt = f"""You are an expert web designer. Create ADVANCED RESPONSIVE HTML5 portfolio that is UNIQUE with enriched modern features.
+
+        with stage('prompt_build'):
+            prompt = prompt or provider.prompt(resume_text)
+        create = provider.client(api_key, model) if provider.client else None
+
+        def send(messages, max_tokens):
+            request = provider.request(api_key, model, messages, max_tokens)
+            timeout = request_timeout(deadline)
+            if create is None:
+                return provider.parse(post_json(*request, provider=provider.name,
+                                                timeout=min(timeout, REQUEST_TIMEOUT)))
+            return provider.parse(create(**request, timeout=timeout))
+
+        return complete_document(send, prompt, max_tokens, end_marker=end_marker, deadline=deadline)
+    except Exception as e:
+        print(f"{provider.name} error: {e}")
+        if is_client_error(e):
+            raise ProviderError(str(e)) from e
+        return None
+
+
+def call_euron_ai(resume_text: str, model: str, api_key: Optional[str] = None,
+                  max_tokens: int = 4096, prompt: Optional[str] = None,
+                  end_marker: str = '</html>') -> Optional[str]:
+    """Call Euron.ai API (OpenAI-compatible, FREE 10k tokens/day)"""
+    return call_provider(EURON, resume_text, model, api_key, max_tokens, prompt, end_marker)
+
+
+def euron_prompt(resume_text: str) -> str:
+    """Built-in full-design prompt for Euron.ai"""
+    return f"""You are an expert web designer. Create ADVANCED RESPONSIVE HTML5 portfolio that is UNIQUE with enriched modern features.
 
 Extract: Name, title, email, phone, location, summary, ALL work experience (3-5 achievements), ALL education, technical skills grouped by category, soft skills, certifications.
 
@@ -88,47 +281,45 @@ Create DIFFERENT design each time - vary layout, colors, and style (modern minim
 ONLY complete HTML5 with embedded CSS. NO external dependencies, NO images. Starting <!DOCTYPE html>, NO markdown.
 
 Resume: {resume_text}"""
-        
-        response = requests.post(
-            'https://api.euron.one/api/v1/euri/chat/completions',
-            headers={
-                'Authorization': f'Bearer {api_key}',
-                'Content-Type': 'application/json'
-            },
-            json={
-                'messages': [{'role': 'user', 'content': prompt}],
-                'model': model_name,
-                'temperature': 0.8,
-                'max_tokens': 4096
-            },
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            return data['choices'][0]['message']['content']
-        else:
-            print(f"Euron.ai error: {response.status_code} - {response.text}")
-            return None
-    except Exception as e:
-        print(f"Euron.ai error: {e}")
-        return None
 
 
-def call_google_gemini(resume_text: str, model: str, api_key: Optional[str] = None) -> Optional[str]:
+def euron_request(api_key: str, model: str, messages: list, max_tokens: int) -> RestRequest:
+    # Extract model name (format: euron:gpt-4.1-nano)
+    model_name = model.split(':')[1] if ':' in model else model
+    return (
+        f"{_base_url('EURON_BASE_URL')}/chat/completions",
+        {
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        },
+        {
+            'messages': messages,
+            'model': model_name,
+            'temperature': 0.8,
+            'max_tokens': max_tokens
+        }
+    )
+
+
+def parse_chat_json(data: dict) -> Reply:
+    """(text, finish_reason) of an OpenAI-compatible chat completion JSON body"""
+    choice = data['choices'][0]
+    return choice['message']['content'], choice.get('finish_reason')
+
+
+EURON = Provider('Euron.ai', 'EURON_API_KEY', euron_prompt, euron_request, parse_chat_json)
+
+
+def call_google_gemini(resume_text: str, model: str, api_key: Optional[str] = None,
+                       max_tokens: int = 4096, prompt: Optional[str] = None,
+                       end_marker: str = '</html>') -> Optional[str]:
     """Call Google Gemini API"""
-    try:
-        import google.generativeai as genai
-        
-        api_key = api_key or os.getenv('GOOGLE_API_KEY')
-        if not api_key:
-            print("GOOGLE_API_KEY not set")
-            return None
-        
-        genai.configure(api_key=api_key)
-        client = genai.GenerativeModel(model)
-        
-        prompt = f"""You are an expert web designer and developer. Generate an ADVANCED, RESPONSIVE, PROFESSIONAL HTML5 portfolio website that is UNIQUE and ENRICHED with modern features.
+    return call_provider(GEMINI, resume_text, model, api_key, max_tokens, prompt, end_marker)
+
+
+def gemini_prompt(resume_text: str) -> str:
+    """Built-in full-design prompt for Gemini"""
+    return f"""You are an expert web designer and developer. Generate an ADVANCED, RESPONSIVE, PROFESSIONAL HTML5 portfolio website that is UNIQUE and ENRICHED with modern features.
 
 === DATA EXTRACTION ===
 Carefully extract from resume: Full name, professional title, email, phone, location, professional summary, ALL work experience, ALL education, ALL technical skills grouped by category, certifications, awards.
@@ -180,27 +371,51 @@ Create DIFFERENT design each time: Modern minimalist, Colorful creative, Dark pr
 
 Resume:
 {resume_text}"""
-        
-        response = client.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        print(f"Google Gemini error: {e}")
-        return None
 
 
-def call_openai(resume_text: str, model: str, api_key: Optional[str] = None) -> Optional[str]:
+def gemini_client(api_key: str, model: str, http_client=None) -> Callable:
+    """generate_content of a Gemini model (generate_content_async for the async path)"""
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    client = genai.GenerativeModel(model)
+    # The SDK talks gRPC, so the shared httpx pool isn't used, only the async call
+    generate = client.generate_content_async if http_client is not None else client.generate_content
+    return lambda timeout, **request: generate(**request, request_options={'timeout': timeout})
+
+
+def gemini_request(api_key: str, model: str, messages: list, max_tokens: int) -> dict:
+    return {
+        'contents': [
+            {'role': 'model' if m['role'] == 'assistant' else 'user', 'parts': [m['content']]}
+            for m in messages
+        ],
+        'generation_config': {'max_output_tokens': max_tokens},
+    }
+
+
+def parse_gemini(response) -> Reply:
+    finish_reason = None
+    if response.candidates:
+        reason = response.candidates[0].finish_reason
+        finish_reason = getattr(reason, 'name', reason)
+    return response.text, finish_reason
+
+
+GEMINI = Provider('Google Gemini', 'GOOGLE_API_KEY', gemini_prompt, gemini_request, parse_gemini,
+                  client=gemini_client)
+
+
+def call_openai(resume_text: str, model: str, api_key: Optional[str] = None,
+                max_tokens: int = 4096, prompt: Optional[str] = None,
+                end_marker: str = '</html>') -> Optional[str]:
     """Call OpenAI API"""
-    try:
-        from openai import OpenAI
-        
-        api_key = api_key or os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            print("OPENAI_API_KEY not set")
-            return None
-        
-        client = OpenAI(api_key=api_key)
-        
-        prompt = f"""You are an expert web designer and developer. Generate an ADVANCED, RESPONSIVE, PROFESSIONAL HTML5 portfolio website that is UNIQUE and ENRICHED with modern features.
+    return call_provider(OPENAI, resume_text, model, api_key, max_tokens, prompt, end_marker)
+
+
+def openai_prompt(resume_text: str) -> str:
+    """Built-in full-design prompt for OpenAI"""
+    return f"""You are an expert web designer and developer. Generate an ADVANCED, RESPONSIVE, PROFESSIONAL HTML5 portfolio website that is UNIQUE and ENRICHED with modern features.
 
 === DATA EXTRACTION ===
 Carefully extract from resume:
@@ -303,133 +518,289 @@ Carefully extract from resume:
 
 Resume:
 {resume_text}"""
-        
-        response = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=4096,
-            temperature=0.9
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        print(f"OpenAI error: {e}")
-        return None
 
 
-def call_groq(resume_text: str, model: str, api_key: Optional[str] = None) -> Optional[str]:
+def openai_client(api_key: str, model: str, http_client=None) -> Callable:
+    """chat.completions.create of an OpenAI client (AsyncOpenAI on the shared pool if given one)"""
+    if http_client is not None:
+        from openai import AsyncOpenAI
+        client = AsyncOpenAI(api_key=api_key, base_url=os.getenv('OPENAI_BASE_URL'),
+                             max_retries=0, http_client=http_client)
+    else:
+        from openai import OpenAI
+        client = OpenAI(api_key=api_key, base_url=os.getenv('OPENAI_BASE_URL'), max_retries=0)
+    return client.chat.completions.create
+
+
+def openai_request(api_key: str, model: str, messages: list, max_tokens: int) -> dict:
+    return {'model': model, 'messages': messages, 'max_tokens': max_tokens, 'temperature': 0.9}
+
+
+def parse_chat_completion(response) -> Reply:
+    """(text, finish_reason) of an OpenAI/Groq SDK chat completion"""
+    choice = response.choices[0]
+    return choice.message.content, choice.finish_reason
+
+
+OPENAI = Provider('OpenAI', 'OPENAI_API_KEY', openai_prompt, openai_request, parse_chat_completion,
+                  client=openai_client)
+
+
+def call_groq(resume_text: str, model: str, api_key: Optional[str] = None,
+              max_tokens: int = 4096, prompt: Optional[str] = None,
+              end_marker: str = '</html>') -> Optional[str]:
     """Call Groq API (fast inference)"""
-    try:
-        from groq import Groq
-        
-        api_key = api_key or os.getenv('GROQ_API_KEY')
-        if not api_key:
-            print("GROQ_API_KEY not set")
-            return None
-        
-        client = Groq(api_key=api_key)
-        
-        prompt = f"""You are an expert web designer. Generate ADVANCED RESPONSIVE HTML5 portfolio with enriched features.
+    return call_provider(GROQ, resume_text, model, api_key, max_tokens, prompt, end_marker)
+
+
+def groq_prompt(resume_text: str) -> str:
+    """Built-in full-design prompt for Groq"""
+    return f"""You are an expert web designer. Generate ADVANCED RESPONSIVE HTML5 portfolio with enriched features.
 
 Extract from resume: Name, title, email, phone, summary, ALL experience (3-5 achievements each), ALL education, technical skills (grouped), soft skills, certifications.
 
 Design with: Animated hero section, sticky nav, experience timeline/cards, skill progress bars, education cards, about section, contact section. Include subtle animations, hover effects, gradients, 2-3 color scheme. Make fully responsive (mobile, tablet, desktop). NO external files. ONLY HTML starting <!DOCTYPE html>.
 
 Resume: {resume_text}"""
-        
-        response = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=4096
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        print(f"Groq error: {e}")
-        return None
 
 
-def call_llama_model(resume_text: str, model: str, api_key: Optional[str] = None) -> Optional[str]:
+def groq_client(api_key: str, model: str, http_client=None) -> Callable:
+    """chat.completions.create of a Groq client (AsyncGroq on the shared pool if given one)"""
+    if http_client is not None:
+        from groq import AsyncGroq
+        client = AsyncGroq(api_key=api_key, base_url=os.getenv('GROQ_BASE_URL'),
+                           max_retries=0, http_client=http_client)
+    else:
+        from groq import Groq
+        client = Groq(api_key=api_key, base_url=os.getenv('GROQ_BASE_URL'), max_retries=0)
+    return client.chat.completions.create
+
+
+def groq_request(api_key: str, model: str, messages: list, max_tokens: int) -> dict:
+    return {'model': model, 'messages': messages, 'max_tokens': max_tokens}
+
+
+GROQ = Provider('Groq', 'GROQ_API_KEY', groq_prompt, groq_request, parse_chat_completion,
+                client=groq_client)
+
+
+def call_llama_model(resume_text: str, model: str, api_key: Optional[str] = None,
+                     max_tokens: int = 4096, prompt: Optional[str] = None,
+                     end_marker: str = '</html>') -> Optional[str]:
     """Call Llama models via Together AI or Groq"""
-    try:
-        # Try Together AI first
-        if 'togethercomputer' in model or 'together' in model.lower():
-            return call_together_api(resume_text, model, api_key)
-        # Otherwise try Groq
-        else:
-            return call_groq(resume_text, model, api_key)
-    except Exception as e:
-        print(f"Llama model error: {e}")
-        return None
+    return call_provider(llama_provider(model), resume_text, model, api_key, max_tokens, prompt, end_marker)
+
+
+def llama_provider(model: str) -> 'Provider':
+    # Together AI for its own model ids, Groq otherwise
+    if 'togethercomputer' in model or 'together' in model.lower():
+        return TOGETHER
+    return GROQ
 
 
-def call_together_api(resume_text: str, model: str, api_key: Optional[str] = None) -> Optional[str]:
+def call_together_api(resume_text: str, model: str, api_key: Optional[str] = None,
+                      max_tokens: int = 4096, prompt: Optional[str] = None,
+                      end_marker: str = '</html>') -> Optional[str]:
     """Call Together AI API for Llama and other models"""
-    try:
-        import requests
-        
-        api_key = api_key or os.getenv('TOGETHER_API_KEY')
-        if not api_key:
-            print("TOGETHER_API_KEY not set")
-            return None
-        
-        prompt = f"""Design ADVANCED RESPONSIVE HTML5 portfolio with enriched features. Extract: Name, title, email, phone, summary, ALL experience (3-5 achievements), ALL education, skills grouped, certifications. Design: Animated hero, sticky nav, experience timeline/cards, skill bars, education cards. Responsive mobile/tablet/desktop. Subtle animations, hover effects, gradients, 2-3 color scheme. ONLY HTML starting <!DOCTYPE html>. NO external files.
+    return call_provider(TOGETHER, resume_text, model, api_key, max_tokens, prompt, end_marker)
+
+
+def together_prompt(resume_text: str) -> str:
+    """Built-in full-design prompt for Together AI"""
+    return f"""Design ADVANCED RESPONSIVE HTML5 portfolio with enriched features. Extract: Name, title, email, phone, summary, ALL experience (3-5 achievements), ALL education, skills grouped, certifications. Design: Animated hero, sticky nav, experience timeline/cards, skill bars, education cards. Responsive mobile/tablet/desktop. Subtle animations, hover effects, gradients, 2-3 color scheme. ONLY HTML starting <!DOCTYPE html>. NO external files.
 
 Resume: {resume_text}"""
-        
-        response = requests.post(
-            "https://api.together.xyz/inference",
-            headers={"Authorization": f"Bearer {api_key}"},
-            json={
-                "model": model,
-                "prompt": prompt,
-                "max_tokens": 4096,
-                "temperature": 0.8,
-            },
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            if 'output' in data:
-                return data['output']['choices'][0]['text']
-        return None
-    except Exception as e:
-        print(f"Together AI error: {e}")
-        return None
 
 
-def call_alibaba(resume_text: str, model: str, api_key: Optional[str] = None) -> Optional[str]:
+def together_request(api_key: str, model: str, messages: list, max_tokens: int) -> RestRequest:
+    # Completion-style endpoint: continue by appending the partial output to the prompt
+    return (
+        f"{_base_url('TOGETHER_BASE_URL')}/inference",
+        {"Authorization": f"Bearer {api_key}"},
+        {
+            "model": model,
+            "prompt": _flatten_for_completion(messages),
+            "max_tokens": max_tokens,
+            "temperature": 0.8,
+        }
+    )
+
+
+def parse_together(data: dict) -> Reply:
+    if 'output' not in data:
+        return None, None
+    choice = data['output']['choices'][0]
+    return choice['text'], choice.get('finish_reason')
+
+
+TOGETHER = Provider('Together AI', 'TOGETHER_API_KEY', together_prompt, together_request, parse_together)
+
+
+def call_alibaba(resume_text: str, model: str, api_key: Optional[str] = None,
+                 max_tokens: int = 4096, prompt: Optional[str] = None,
+                 end_marker: str = '</html>') -> Optional[str]:
     """Call Alibaba Qwen API"""
-    try:
-        import requests
-        
-        api_key = api_key or os.getenv('ALIBABA_API_KEY')
-        if not api_key:
-            print("ALIBABA_API_KEY not set")
-            return None
-        
-        prompt = f"""Design ADVANCED RESPONSIVE HTML5 portfolio. Extract: Name, title, email, phone, summary, ALL experience, ALL education, skills grouped, certifications. Create: Hero section with animation, sticky nav, experience timeline/cards, skill progress bars, education cards, about, contact. Responsive mobile/tablet/desktop. Animations, hover effects, gradients, 2-3 colors. ONLY HTML <!DOCTYPE html>. NO external files.
+    return call_provider(ALIBABA, resume_text, model, api_key, max_tokens, prompt, end_marker)
+
+
+def alibaba_prompt(resume_text: str) -> str:
+    """Built-in full-design prompt for Alibaba Qwen"""
+    return f"""Design ADVANCED RESPONSIVE HTML5 portfolio. Extract: Name, title, email, phone, summary, ALL experience, ALL education, skills grouped, certifications. Create: Hero section with animation, sticky nav, experience timeline/cards, skill progress bars, education cards, about, contact. Responsive mobile/tablet/desktop. Animations, hover effects, gradients, 2-3 colors. ONLY HTML <!DOCTYPE html>. NO external files.
 
 Resume: {resume_text}"""
-        
-        response = requests.post(
-            "https://dashscope.aliyuncs.com/api/v1/services/aigc/text-generation/generation",
-            headers={"Authorization": f"Bearer {api_key}"},
-            json={
-                "model": model,
-                "input": {"messages": [{"role": "user", "content": prompt}]},
-                "parameters": {"max_tokens": 4096}
-            },
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            if 'output' in data:
-                return data['output']['text']
-        return None
-    except Exception as e:
-        print(f"Alibaba error: {e}")
-        return None
+
+
+def alibaba_request(api_key: str, model: str, messages: list, max_tokens: int) -> RestRequest:
+    return (
+        f"{_base_url('DASHSCOPE_BASE_URL')}/services/aigc/text-generation/generation",
+        {"Authorization": f"Bearer {api_key}"},
+        {
+            "model": model,
+            "input": {"messages": messages},
+            "parameters": {"max_tokens": max_tokens}
+        }
+    )
+
+
+def parse_alibaba(data: dict) -> Reply:
+    if 'output' not in data:
+        return None, None
+    return data['output']['text'], data['output'].get('finish_reason')
+
+
+ALIBABA = Provider('Alibaba', 'ALIBABA_API_KEY', alibaba_prompt, alibaba_request, parse_alibaba)
+
+
+# REST endpoints, overridable (e.g. to point at tools/mock_llm.py for load tests)
+DEFAULT_BASE_URLS = {
+    'EURON_BASE_URL': 'https://api.euron.one/api/v1/euri',
+    'TOGETHER_BASE_URL': 'https://api.together.xyz',
+    'DASHSCOPE_BASE_URL': 'https://dashscope.aliyuncs.com/api/v1',
+}
+
+
+def _base_url(name: str) -> str:
+    return os.getenv(name, DEFAULT_BASE_URLS[name]).rstrip('/')
+
+
+# Sent after a cut-off response so the model picks up where it stopped
+CONTINUE_PROMPT = ("Your previous reply was cut off. Continue EXACTLY where it stopped. "
+                   "Do not repeat anything, do not restart the document, NO markdown.")
+
+# finish_reason values meaning "ran out of output tokens" across providers
+TRUNCATED_FINISH_REASONS = {'length', 'max_tokens', 'MAX_TOKENS'}
+
+
+# Per-request timeout of the REST providers (the SDKs only get the generation's time left)
+REQUEST_TIMEOUT = 30
+
+
+def request_timeout(deadline: float) -> float:
+    """Timeout for one provider request: what's left of the generation's budget"""
+    return max(1.0, time_left(deadline))
+
+
+def post_json(url: str, headers: dict, payload: dict, provider: str, timeout: float = REQUEST_TIMEOUT) -> dict:
+    """POST a JSON request, raising RetryableError/ProviderError on failure"""
+    import requests
+
+    response = requests.post(url, headers=headers, json=payload, timeout=timeout)
+    return check_response(response.status_code, response.text, response.headers, provider,
+                          response.json)
+
+
+def check_response(status: int, text: str, headers, provider: str, body: Callable[[], dict]) -> dict:
+    """Decoded body of a 200 reply, else RetryableError (429/5xx) or ProviderError"""
+    if status == 200:
+        return body()
+
+    message = f"{provider} error: {status} - {text[:200]}"
+    if status in RETRYABLE_STATUS:
+        raise RetryableError(message, parse_retry_after(headers.get('Retry-After')))
+    raise ProviderError(message, status)
+
+
+def _flatten_for_completion(messages: list) -> str:
+    """Turn chat messages into a single prompt for completion-style endpoints"""
+    prompt = messages[0]['content']
+    partial = ''.join(m['content'] for m in messages if m['role'] == 'assistant')
+    return f"{prompt}\n\n{partial}" if partial else prompt
+
+
+def is_truncated(text: str, finish_reason: Optional[str] = None, end_marker: str = '</html>') -> bool:
+    """True if a generated document was cut off before its closing tag"""
+    if finish_reason in TRUNCATED_FINISH_REASONS:
+        return True
+    return end_marker not in text.lower()
+
+
+def complete_document(send, prompt: str, max_tokens: int, max_continuations: Optional[int] = None,
+                      end_marker: str = '</html>', deadline: Optional[float] = None) -> Optional[str]:
+    """
+    Run a provider request with retries and continue truncated output
+
+    `send(messages, max_tokens)` performs one provider call and returns
+    (text, finish_reason). If the document comes back cut off, a continuation
+    request is issued and appended to the partial output rather than
+    regenerating everything. Past `deadline` (time.monotonic()) no more
+    retries or continuations are started.
+    """
+    steps = document_steps(prompt, max_continuations, end_marker, lambda: time_left(deadline) == 0)
+    messages = next(steps)
+    while True:
+        with stage('provider_call'):
+            reply = call_with_retry(send, messages, max_tokens, deadline=deadline)
+        try:
+            messages = steps.send(reply)
+        except StopIteration as done:
+            return done.value
+
+
+def document_steps(prompt: str, max_continuations: Optional[int] = None, end_marker: str = '</html>',
+                   out_of_time: Callable[[], bool] = lambda: False) -> Generator[list, Reply, Optional[str]]:
+    """
+    The request/continuation logic of complete_document, without any I/O
+
+    Yields the messages for each provider call, is sent back its
+    (text, finish_reason) and returns the finished document, so the sync and
+    async drivers only differ in how they send. Once `out_of_time()` is true
+    the truncated document is returned instead of continuing.
+    """
+    if max_continuations is None:
+        max_continuations = int(os.getenv('LLM_MAX_CONTINUATIONS', 2))
+
+    messages = [{'role': 'user', 'content': prompt}]
+    text, finish_reason = yield messages
+    if not text:
+        return text
+
+    continuations = 0
+    while is_truncated(text, finish_reason, end_marker) and continuations < max_continuations:
+        if out_of_time():
+            print("Output truncated, but the generation time budget is used up")
+            break
+        continuations += 1
+        print(f"Output truncated (finish_reason={finish_reason}); continuation {continuations}")
+        more, finish_reason = yield messages + [
+            {'role': 'assistant', 'content': text},
+            {'role': 'user', 'content': CONTINUE_PROMPT},
+        ]
+        if not more:
+            break
+        text += _strip_code_fence(more)
+
+    return text
+
+
+def _strip_code_fence(text: str) -> str:
+    """Drop a leading ```html fence some models add to continuations"""
+    stripped = text.lstrip()
+    if stripped.startswith('```'):
+        stripped = stripped.split('\n', 1)[1] if '\n' in stripped else ''
+        if stripped.rstrip().endswith('```'):
+            stripped = stripped.rstrip()[:-3]
+        return stripped
+    return text
 
 
 def generate_portfolio_template(resume_text):
@@ -475,161 +846,7 @@ def generate_portfolio_template(resume_text):
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Professional Portfolio</title>
     <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background: #f4f4f4;
-        }}
-        
-        header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 60px 20px;
-            text-align: center;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        
-        header h1 {{
-            font-size: 2.5em;
-            margin-bottom: 10px;
-            font-weight: 700;
-        }}
-        
-        header p {{
-            font-size: 1.1em;
-            opacity: 0.9;
-            margin-bottom: 20px;
-        }}
-        
-        .contact-info {{
-            display: flex;
-            justify-content: center;
-            gap: 30px;
-            margin-top: 20px;
-            flex-wrap: wrap;
-        }}
-        
-        .contact-info span {{
-            font-size: 0.95em;
-            opacity: 0.9;
-        }}
-        
-        .container {{
-            max-width: 900px;
-            margin: 0 auto;
-            padding: 0 20px;
-        }}
-        
-        section {{
-            background: white;
-            margin: 40px auto;
-            padding: 40px;
-            border-radius: 8px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        
-        section h2 {{
-            color: #667eea;
-            font-size: 1.8em;
-            margin-bottom: 30px;
-            padding-bottom: 10px;
-            border-bottom: 3px solid #667eea;
-        }}
-        
-        .skill-tags {{
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-            margin-bottom: 10px;
-        }}
-        
-        .skill-tag {{
-            background: #667eea;
-            color: white;
-            padding: 8px 15px;
-            border-radius: 20px;
-            font-size: 0.9em;
-            transition: all 0.3s ease;
-        }}
-        
-        .skill-tag:hover {{
-            background: #764ba2;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
-        }}
-        
-        .experience-item {{
-            margin-bottom: 30px;
-            padding-bottom: 20px;
-            border-bottom: 1px solid #e0e0e0;
-        }}
-        
-        .experience-item:last-child {{
-            border-bottom: none;
-        }}
-        
-        .experience-item h3 {{
-            color: #333;
-            margin-bottom: 5px;
-            font-size: 1.1em;
-        }}
-        
-        .experience-item .date {{
-            color: #666;
-            font-size: 0.9em;
-            font-style: italic;
-            margin-bottom: 10px;
-        }}
-        
-        .about-text {{
-            color: #555;
-            line-height: 1.8;
-            margin-bottom: 20px;
-        }}
-        
-        footer {{
-            background: #333;
-            color: white;
-            text-align: center;
-            padding: 30px 20px;
-            margin-top: 60px;
-        }}
-        
-        footer p {{
-            margin: 10px 0;
-        }}
-        
-        @media (max-width: 768px) {{
-            header h1 {{
-                font-size: 1.8em;
-            }}
-            
-            section {{
-                padding: 30px 20px;
-                margin: 30px auto;
-            }}
-            
-            .contact-info {{
-                flex-direction: column;
-                gap: 15px;
-            }}
-            
-            .skill-tags {{
-                gap: 8px;
-            }}
-            
-            .skill-tag {{
-                padding: 6px 12px;
-                font-size: 0.85em;
-            }}
-        }}
+{TEMPLATE_CSS}
     </style>
 </head>
 <body>
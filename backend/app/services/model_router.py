@@ -0,0 +1,292 @@
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+
+# Rough chars-per-token ratio used for sizing prompts and output budgets
+CHARS_PER_TOKEN = 4
+DAY_SECONDS = 24 * 60 * 60
+
+
+@dataclass
+class ProviderProfile:
+    """Static description of a provider the router may pick for model='auto'"""
+    name: str
+    model: str
+    env_key: str
+    key_pattern: Optional[str] = None  # regex a user-supplied key must match (re.match)
+    cost_in: float = 0.0          # USD cents per 1k prompt tokens
+    cost_out: float = 0.0         # USD cents per 1k completion tokens
+    max_output_tokens: int = 8192
+    expected_latency: float = 15.0  # prior (seconds) before any observations
+    daily_token_quota: Optional[int] = None
+
+
+@dataclass
+class ProviderStats:
+    """Observed behaviour of a provider, updated after every call"""
+    latency: float
+    error_rate: float = 0.0
+    calls: int = 0
+    window_start: float = 0.0
+    tokens_used: int = 0
+    tokens_reserved: int = 0  # routed but not yet recorded
+    observed_at: float = 0.0
+
+
+@dataclass
+class Route:
+    """Routing decision returned by ModelRouter.choose"""
+    provider: str
+    model: str
+    max_tokens: int
+    score: float
+    scores: Dict[str, float] = field(default_factory=dict)
+    reserved: int = 0  # quota tokens held until record()/release()
+
+
+DEFAULT_PROVIDERS = [
+    ProviderProfile('euron', 'euron:gpt-4.1-nano', 'EURON_API_KEY',
+                    cost_in=0.0, cost_out=0.0, max_output_tokens=4096,
+                    expected_latency=20.0, daily_token_quota=10000),
+    ProviderProfile('groq', 'llama-3.3-70b', 'GROQ_API_KEY', key_pattern=r'gsk_',
+                    cost_in=0.059, cost_out=0.079, max_output_tokens=8192,
+                    expected_latency=6.0),
+    ProviderProfile('gemini', 'gemini-2.5-flash', 'GOOGLE_API_KEY', key_pattern=r'AIza',
+                    cost_in=0.03, cost_out=0.25, max_output_tokens=8192,
+                    expected_latency=12.0),
+    # DashScope keys are sk- plus 32 hex digits, so OpenAI takes the other sk- keys
+    ProviderProfile('openai', 'gpt-4o-mini', 'OPENAI_API_KEY', key_pattern=r'sk-(?![0-9a-f]{32}$)',
+                    cost_in=0.015, cost_out=0.06, max_output_tokens=8192,
+                    expected_latency=15.0),
+    ProviderProfile('alibaba', 'qwen/qwen3-32b', 'ALIBABA_API_KEY', key_pattern=r'sk-[0-9a-f]{32}$',
+                    cost_in=0.02, cost_out=0.08, max_output_tokens=8192,
+                    expected_latency=18.0),
+]
+
+
+def provider_for_model(model: str) -> Optional[str]:
+    """Map a model string to its provider name (mirrors call_llm_api dispatch)"""
+    if model.startswith('euron'):
+        return 'euron'
+    elif model.startswith('gemini'):
+        return 'gemini'
+    elif model.startswith('gpt'):
+        return 'openai'
+    elif model.startswith('llama') or 'llama' in model:
+        return 'groq'
+    elif model.startswith('qwen'):
+        return 'alibaba'
+    elif model.startswith('groq'):
+        return 'groq'
+    return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate, good enough for budgeting"""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def output_budget(resume_text: str, cap: int = 8192) -> int:
+    """
+    Size the completion budget to the resume instead of a fixed 4096
+
+    A fixed design/CSS overhead plus room proportional to the resume content.
+    """
+    budget = 1536 + int(estimate_tokens(resume_text) * 1.5)
+    return max(2048, min(budget, cap))
+
+
+def content_budget(resume_text: str, cap: int = 8192) -> int:
+    """Completion budget when the theme library supplies the CSS (markup only)"""
+    budget = 512 + int(estimate_tokens(resume_text) * 1.5)
+    return max(1024, min(budget, cap))
+
+
+class ModelRouter:
+    """
+    Pick a provider/model for model='auto'
+
+    Providers are scored on estimated cost, observed latency and error rate
+    (exponentially weighted), and skipped when they are missing an API key or
+    their remaining daily quota can't cover the request. Ties are broken by
+    provider order, so the same inputs always give the same route.
+
+    Observations fade back toward the provider's prior with a half-life of
+    `decay_half_life` seconds, so a provider demoted by a few failures is
+    tried again later instead of never. A chosen route reserves its tokens
+    against the daily quota until the call is recorded, so concurrent
+    requests can't all spend the same remaining quota.
+    """
+
+    def __init__(self, providers: Optional[List[ProviderProfile]] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 cost_weight: Optional[float] = None,
+                 latency_weight: Optional[float] = None,
+                 error_weight: Optional[float] = None,
+                 smoothing: float = 0.3,
+                 env: Optional[Dict[str, str]] = None,
+                 decay_half_life: Optional[float] = None):
+        self.providers = list(providers or DEFAULT_PROVIDERS)
+        self.clock = clock
+        self.env = env if env is not None else os.environ
+        self.cost_weight = _weight(cost_weight, self.env, 'ROUTER_COST_WEIGHT', 1.0)
+        self.latency_weight = _weight(latency_weight, self.env, 'ROUTER_LATENCY_WEIGHT', 0.1)
+        self.error_weight = _weight(error_weight, self.env, 'ROUTER_ERROR_WEIGHT', 10.0)
+        self.smoothing = smoothing
+        self.decay_half_life = _weight(decay_half_life, self.env, 'ROUTER_DECAY_HALF_LIFE', 600.0)
+        self._lock = threading.Lock()
+        now = self.clock()
+        self._profiles = {p.name: p for p in self.providers}
+        self._stats = {
+            p.name: ProviderStats(latency=p.expected_latency, window_start=now, observed_at=now)
+            for p in self.providers
+        }
+
+    def candidates(self, api_key: Optional[str] = None) -> List[ProviderProfile]:
+        """
+        Providers usable with the given key (or with keys from the environment)
+
+        A key is only sent to providers whose key_pattern it matches; a key no
+        pattern recognises goes to the providers without one (e.g. Euron.ai),
+        never to every provider.
+        """
+        if api_key:
+            matching = [p for p in self.providers
+                        if p.key_pattern and re.match(p.key_pattern, api_key)]
+            return matching or [p for p in self.providers if not p.key_pattern]
+        return [p for p in self.providers if self.env.get(p.env_key)]
+
+    def remaining_quota(self, provider: ProviderProfile) -> Optional[int]:
+        """Tokens left in the current day window, None if unlimited"""
+        quota = self._quota(provider)
+        if quota is None:
+            return None
+        with self._lock:
+            stats = self._roll_window(provider.name)
+            return max(0, quota - stats.tokens_used - stats.tokens_reserved)
+
+    def choose(self, resume_text: str, api_key: Optional[str] = None) -> Optional[Route]:
+        """
+        Return the best route for this resume, or None if no provider is usable
+
+        The route's tokens stay reserved until record() or release() is called
+        with its `reserved` count.
+        """
+        prompt_tokens = estimate_tokens(resume_text)
+        best = None
+        scores = {}
+
+        with self._lock:
+            for provider in self.candidates(api_key):
+                max_tokens = output_budget(resume_text, provider.max_output_tokens)
+                quota = self._quota(provider)
+                stats = self._roll_window(provider.name)
+                if quota is not None and quota - stats.tokens_used - stats.tokens_reserved < prompt_tokens + max_tokens:
+                    continue
+
+                self._decay(provider.name)
+                cost = (prompt_tokens * provider.cost_in + max_tokens * provider.cost_out) / 1000
+                score = (self.cost_weight * cost
+                         + self.latency_weight * stats.latency
+                         + self.error_weight * stats.error_rate)
+                scores[provider.name] = score
+
+                if best is None or score < best.score:
+                    best = Route(provider.name, provider.model, max_tokens, score)
+
+            if best is not None:
+                best.scores = scores
+                best.reserved = prompt_tokens + best.max_tokens
+                self._stats[best.provider].tokens_reserved += best.reserved
+        return best
+
+    def record(self, model: str, latency: float, success: bool, tokens: int = 0, reserved: int = 0) -> None:
+        """
+        Feed back the outcome of a provider call (not client errors such as a bad key)
+
+        `reserved` is the route's reservation, replaced by the `tokens` actually used.
+        """
+        name = self._provider_name(model)
+        if name not in self._stats:
+            return
+
+        alpha = self.smoothing
+        with self._lock:
+            stats = self._decay(name)
+            self._unreserve(stats, reserved)
+            stats.calls += 1
+            stats.error_rate = (1 - alpha) * stats.error_rate + alpha * (0.0 if success else 1.0)
+            if success:
+                stats.latency = (1 - alpha) * stats.latency + alpha * latency
+            stats.tokens_used += tokens
+
+    def release(self, model: str, reserved: int) -> None:
+        """Give back a route's reservation without recording an outcome"""
+        name = self._provider_name(model)
+        if name not in self._stats:
+            return
+        with self._lock:
+            self._unreserve(self._roll_window(name), reserved)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Current per-provider stats, for metrics endpoints"""
+        with self._lock:
+            return {
+                name: {
+                    'latency': round(s.latency, 3),
+                    'error_rate': round(s.error_rate, 3),
+                    'calls': s.calls,
+                    'tokens_used': s.tokens_used,
+                    'tokens_reserved': s.tokens_reserved,
+                }
+                for name, s in self._stats.items()
+            }
+
+    def _quota(self, provider: ProviderProfile) -> Optional[int]:
+        override = self.env.get(f'ROUTER_QUOTA_{provider.name.upper()}')
+        if override:
+            return int(override)
+        return provider.daily_token_quota
+
+    def _provider_name(self, model: str) -> Optional[str]:
+        # The routed models first, so custom provider lists are recorded too
+        return next((p.name for p in self.providers if p.model == model), None) or provider_for_model(model)
+
+    def _roll_window(self, name: str) -> ProviderStats:
+        # Caller holds self._lock. Reservations carry over: those calls are still running.
+        stats = self._stats[name]
+        now = self.clock()
+        if now - stats.window_start >= DAY_SECONDS:
+            stats.window_start = now
+            stats.tokens_used = 0
+        return stats
+
+    def _decay(self, name: str) -> ProviderStats:
+        # Caller holds self._lock. Fade latency and error rate toward the prior.
+        stats = self._roll_window(name)
+        now = self.clock()
+        elapsed = now - stats.observed_at
+        if elapsed > 0 and self.decay_half_life > 0:
+            keep = 0.5 ** (elapsed / self.decay_half_life)
+            prior = self._profiles[name].expected_latency
+            stats.latency = prior + (stats.latency - prior) * keep
+            stats.error_rate *= keep
+        stats.observed_at = now
+        return stats
+
+    def _unreserve(self, stats: ProviderStats, reserved: int) -> None:
+        stats.tokens_reserved = max(0, stats.tokens_reserved - reserved)
+
+
+def _weight(value: Optional[float], env, name: str, default: float) -> float:
+    if value is not None:
+        return value
+    return float(env.get(name, default))
+
+
+# Process-wide router used by generate_portfolio
+model_router = ModelRouter()
@@ -0,0 +1,184 @@
+import contextvars
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+# Session of the request currently being profiled (None when profiling is off)
+_current_session = contextvars.ContextVar('profile_session', default=None)
+
+# tracemalloc is process-wide; count sessions so overlapping ones don't stop it early
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Time a named stage (extraction, prompt_build, provider_call, ...)
+
+    A no-op unless the current request is being profiled.
+    """
+    session = _current_session.get()
+    if session is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        session.add_stage(name, time.perf_counter() - started)
+
+
+class ProfileSession:
+    """
+    CPU profile, tracemalloc peak and stage timings for one request
+
+    cProfile only sees the request thread: work on other threads (progressive
+    upgrades, provider calls on the async event loop with ASYNC_PROVIDERS=true)
+    shows up as waiting time, not as its own functions. Stage timings still
+    cover async provider calls made on behalf of the request.
+    """
+
+    def __init__(self, label: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.created_at = time.time()
+        self.duration = 0.0
+        self.memory_peak = 0
+        self.stages: Dict[str, float] = {}
+        self.profiler = cProfile.Profile()
+        self.stats = None
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def start(self) -> None:
+        global _tracemalloc_users
+        with _tracemalloc_lock:
+            if _tracemalloc_users == 0:
+                tracemalloc.start()
+            else:
+                # Peak is shared with overlapping sessions; best effort
+                tracemalloc.reset_peak()
+            _tracemalloc_users += 1
+        self._started = time.perf_counter()
+        try:
+            self.profiler.enable()
+        except Exception:
+            # e.g. ValueError on Python 3.12+ when another profiler is already active
+            self._release_tracemalloc()
+            raise
+
+    def stop(self) -> None:
+        self.profiler.disable()
+        self.duration = time.perf_counter() - self._started
+        with _tracemalloc_lock:
+            self.memory_peak = tracemalloc.get_traced_memory()[1]
+        self._release_tracemalloc()
+        self.profiler.create_stats()
+        self.stats = self.profiler.stats
+        self.profiler = None
+
+    def _release_tracemalloc(self) -> None:
+        global _tracemalloc_users
+        with _tracemalloc_lock:
+            _tracemalloc_users -= 1
+            if _tracemalloc_users == 0:
+                tracemalloc.stop()
+
+    def summary(self, limit: int = 30) -> str:
+        """Top functions by cumulative time, pstats text format"""
+        out = io.StringIO()
+        stats = pstats.Stats(_StatsHolder(self.stats), stream=out)
+        stats.sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+
+    def dump(self) -> bytes:
+        """Profile in the binary .prof format read by pstats/snakeviz"""
+        return marshal.dumps(self.stats)
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'label': self.label,
+            'created_at': self.created_at,
+            'duration_seconds': round(self.duration, 4),
+            'memory_peak_bytes': self.memory_peak,
+            'stages': {name: round(seconds, 4) for name, seconds in self.stages.items()},
+        }
+
+
+class _StatsHolder:
+    """Adapter letting pstats.Stats load an already collected stats dict"""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class ProfileStore:
+    """Bounded in-memory store of recent profiles (oldest dropped first)"""
+
+    def __init__(self, max_profiles: int = 50):
+        self.max_profiles = max_profiles
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._profiles[session.id] = session
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[ProfileSession]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict]:
+        with self._lock:
+            return [s.to_dict() for s in reversed(self._profiles.values())]
+
+
+def should_profile(config, headers, rand=random.random) -> bool:
+    """Profile when enabled and asked for via X-Profile header or picked by sampling"""
+    if not config.get('PROFILING_ENABLED'):
+        return False
+    if headers.get('X-Profile', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return rand() < config.get('PROFILING_SAMPLE_RATE', 0.0)
+
+
+@contextmanager
+def profile_request(store: ProfileStore, label: str):
+    """
+    Profile the enclosed block and save the result to `store`
+
+    Yields the session, or None if the profiler could not start (the block
+    still runs; profiling never fails a request).
+    """
+    session = ProfileSession(label)
+    try:
+        session.start()
+    except Exception as e:
+        print(f"Profiling skipped for {label}: {e}")
+        yield None
+        return
+    token = _current_session.set(session)
+    try:
+        yield session
+    finally:
+        session.stop()
+        _current_session.reset(token)
+        store.add(session)
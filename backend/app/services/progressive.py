@@ -0,0 +1,145 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from app.services.admission import AdmissionRejected, AsyncLane, Lane
+from app.services.async_providers import event_loop, generate_portfolio_llm_async
+from app.services.job_queue import DONE as JOB_DONE, FAILED as JOB_FAILED, JobQueue
+from app.services.llm_service import generate_portfolio_llm, uses_async_providers
+
+
+# Upgrade states
+PENDING = 'pending'
+DONE = 'done'
+UNAVAILABLE = 'unavailable'  # LLM failed or was shed; the client keeps the preview
+
+
+class UpgradeStore:
+    """
+    Background upgrade results, kept in the shared job queue backend
+
+    Upgrades are tracked jobs (never handed to the worker tier), so any web
+    process sharing JOB_QUEUE_URL can answer a poll, not just the one that
+    runs the upgrade.
+    """
+
+    def __init__(self, queue: JobQueue):
+        self.queue = queue
+
+    def create(self) -> str:
+        return self.queue.track()
+
+    def finish(self, upgrade_id: str, status: str, portfolio: Optional[str] = None) -> None:
+        if status == DONE:
+            self.queue.complete(upgrade_id, portfolio)
+        else:
+            self.queue.fail(upgrade_id, 'LLM generation unavailable')
+
+    def get(self, upgrade_id: str) -> Optional[Dict]:
+        job = self.queue.get(upgrade_id)
+        if job is None:
+            return None
+        status = {JOB_DONE: DONE, JOB_FAILED: UNAVAILABLE}.get(job['status'], PENDING)
+        return {'status': status, 'portfolio': job['result'] if status == DONE else None}
+
+
+class ProgressiveGenerator:
+    """
+    Run LLM generations in the background for progressive responses
+
+    The request returns the offline template straight away with an upgrade
+    id; the LLM version is generated here (through the LLM admission lane)
+    and picked up by the client when it polls. At most `max_pending`
+    upgrades are queued or running; beyond that submit() returns None and the
+    client just keeps the template.
+
+    With ASYNC_PROVIDERS=true upgrades run as coroutines on the shared event
+    loop instead of executor threads, admitted through `async_lane`; when that
+    lane is full submit() also returns None.
+    """
+
+    def __init__(self, store: UpgradeStore, lane: Lane, async_lane: AsyncLane,
+                 max_workers: int = 8, max_pending: int = 32):
+        self.store = store
+        self.lane = lane
+        self.async_lane = async_lane
+        self.max_pending = max_pending
+        self.pending = 0
+        self.shed = 0
+        self._lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='progressive')
+
+    def submit(self, resume_text: str, model: str, api_key: str) -> Optional[str]:
+        """Start an upgrade and return its id, or None if too many are pending"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.shed += 1
+                return None
+            self.pending += 1
+
+        run_async = uses_async_providers()
+        if run_async:
+            try:
+                self.async_lane.admit()
+            except AdmissionRejected:
+                with self._lock:
+                    self.pending -= 1
+                    self.shed += 1
+                return None
+        try:
+            upgrade_id = self.store.create()
+        except Exception:
+            if run_async:
+                self.async_lane.withdraw()
+            self._done()
+            raise
+
+        if run_async:
+            # Fresh context so the upgrade doesn't report into the request's profile
+            contextvars.Context().run(event_loop.submit,
+                                      self._run_async(upgrade_id, resume_text, model, api_key))
+        else:
+            self.executor.submit(self._run, upgrade_id, resume_text, model, api_key)
+        return upgrade_id
+
+    def _run(self, upgrade_id: str, resume_text: str, model: str, api_key: str) -> None:
+        try:
+            with self.lane.slot():
+                html = generate_portfolio_llm(resume_text, model, api_key)
+        except AdmissionRejected as e:
+            print(f"Progressive upgrade {upgrade_id} shed: {e}")
+            html = None
+        except Exception as e:
+            print(f"Progressive upgrade {upgrade_id} failed: {e}")
+            html = None
+        self._finish(upgrade_id, html)
+
+    async def _run_async(self, upgrade_id: str, resume_text: str, model: str, api_key: str) -> None:
+        try:
+            async with self.async_lane.slot_async():
+                html = await generate_portfolio_llm_async(resume_text, model, api_key)
+        except AdmissionRejected as e:
+            print(f"Progressive upgrade {upgrade_id} shed: {e}")
+            html = None
+        except Exception as e:
+            print(f"Progressive upgrade {upgrade_id} failed: {e}")
+            html = None
+        self._finish(upgrade_id, html)
+
+    def _finish(self, upgrade_id: str, html: Optional[str]) -> None:
+        try:
+            if html:
+                self.store.finish(upgrade_id, DONE, html)
+            else:
+                self.store.finish(upgrade_id, UNAVAILABLE)
+        finally:
+            self._done()
+
+    def _done(self) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'pending': self.pending, 'max_pending': self.max_pending, 'shed': self.shed}
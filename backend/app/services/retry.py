@@ -0,0 +1,183 @@
+import asyncio
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+
+# HTTP statuses worth retrying: timeouts, rate limits and server-side failures
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class RetryableError(Exception):
+    """Transient provider failure (429/5xx/timeout) that may succeed on retry"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ProviderError(Exception):
+    """Permanent provider failure (bad key, bad request, ...), never retried"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify(exc: Exception):
+    """
+    Decide whether an exception is worth retrying
+
+    Works for our own errors, requests exceptions and the provider SDKs
+    (OpenAI/Groq expose status_code + response, Google exposes code).
+
+    Returns:
+        (retryable, retry_after_seconds)
+    """
+    if isinstance(exc, ProviderError):
+        return False, None
+    if isinstance(exc, RetryableError):
+        return True, exc.retry_after
+
+    name = type(exc).__name__
+    if 'Timeout' in name or 'Connection' in name:
+        return True, None
+
+    status = getattr(exc, 'status_code', None) or getattr(exc, 'code', None)
+    if isinstance(status, int) and status in RETRYABLE_STATUS:
+        response = getattr(exc, 'response', None)
+        headers = getattr(response, 'headers', None) or {}
+        return True, parse_retry_after(headers.get('retry-after') or headers.get('Retry-After'))
+
+    return False, None
+
+
+def is_client_error(exc: Exception) -> bool:
+    """
+    True if the request itself was rejected (bad or mismatched key, bad request)
+
+    Such failures say nothing about the provider's health, so they aren't fed
+    to the model router. Rate limits and other retryable statuses don't count.
+    """
+    status = (getattr(exc, 'status', None) or getattr(exc, 'status_code', None)
+              or getattr(exc, 'code', None))
+    return isinstance(status, int) and 400 <= status < 500 and status not in RETRYABLE_STATUS
+
+
+def generation_deadline(total: Optional[float] = None) -> float:
+    """
+    time.monotonic() deadline for one whole generation (LLM_TOTAL_TIMEOUT)
+
+    Covers every attempt and continuation; keep it below JOB_VISIBILITY_TIMEOUT
+    so the worker tier doesn't redeliver a job that is still running.
+    """
+    if total is None:
+        total = float(os.getenv('LLM_TOTAL_TIMEOUT', 240))
+    return time.monotonic() + total
+
+
+def time_left(deadline: Optional[float]) -> Optional[float]:
+    """Seconds until the deadline (0 once passed), None without a deadline"""
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float,
+                  rand: Callable[[], float] = random.random) -> float:
+    """Exponential backoff with full jitter for the given (0-based) attempt"""
+    return rand() * min(max_delay, base_delay * (2 ** attempt))
+
+
+def call_with_retry(fn: Callable, *args,
+                    attempts: Optional[int] = None,
+                    base_delay: Optional[float] = None,
+                    max_delay: Optional[float] = None,
+                    deadline: Optional[float] = None,
+                    sleep: Callable[[float], None] = time.sleep,
+                    rand: Callable[[], float] = random.random,
+                    **kwargs):
+    """
+    Call fn(*args, **kwargs), retrying transient failures
+
+    Retryable errors are retried up to `attempts` times in total with
+    exponential backoff and jitter. A server-provided Retry-After is honoured
+    unless it exceeds max_delay, in which case waiting isn't worth it and the
+    error is raised straight away. Nor is a retry made if its wait would
+    reach `deadline` (a time.monotonic() value).
+    """
+    attempts, base_delay, max_delay = _retry_settings(attempts, base_delay, max_delay)
+
+    for attempt in range(attempts):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            delay = _retry_delay(e, attempt, attempts, base_delay, max_delay, rand, deadline)
+            if delay is None:
+                raise
+            sleep(delay)
+
+
+async def call_with_retry_async(fn: Callable, *args,
+                                attempts: Optional[int] = None,
+                                base_delay: Optional[float] = None,
+                                max_delay: Optional[float] = None,
+                                deadline: Optional[float] = None,
+                                rand: Callable[[], float] = random.random,
+                                **kwargs):
+    """call_with_retry for coroutine functions, backing off with asyncio.sleep"""
+    attempts, base_delay, max_delay = _retry_settings(attempts, base_delay, max_delay)
+
+    for attempt in range(attempts):
+        try:
+            return await fn(*args, **kwargs)
+        except Exception as e:
+            delay = _retry_delay(e, attempt, attempts, base_delay, max_delay, rand, deadline)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+
+
+def _retry_settings(attempts, base_delay, max_delay):
+    attempts = attempts or int(os.getenv('LLM_RETRY_ATTEMPTS', 3))
+    base_delay = base_delay if base_delay is not None else float(os.getenv('LLM_RETRY_BASE_DELAY', 0.5))
+    max_delay = max_delay if max_delay is not None else float(os.getenv('LLM_RETRY_MAX_DELAY', 8))
+    return attempts, base_delay, max_delay
+
+
+def _retry_delay(exc: Exception, attempt: int, attempts: int, base_delay: float,
+                 max_delay: float, rand: Callable[[], float],
+                 deadline: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait before the next attempt, or None to give up and re-raise"""
+    retryable, retry_after = classify(exc)
+    if not retryable or attempt == attempts - 1:
+        return None
+    if retry_after is not None:
+        if retry_after > max_delay:
+            return None
+        delay = retry_after
+    else:
+        delay = backoff_delay(attempt, base_delay, max_delay, rand)
+    remaining = time_left(deadline)
+    if remaining is not None and delay >= remaining:
+        print(f"Not retrying after error ({exc}): generation time budget used up")
+        return None
+    print(f"Retrying after error ({exc}); attempt {attempt + 2}/{attempts} in {delay:.2f}s")
+    return delay
@@ -0,0 +1,149 @@
+import gzip
+import hashlib
+import re
+import zipfile
+from typing import Iterator, List, Tuple
+
+
+STYLE_RE = re.compile(r'<style[^>]*>(.*?)</style>', re.S | re.I)
+# Blocks whose whitespace is significant and must survive minification
+PRESERVE_RE = re.compile(r'(<(pre|textarea|script)\b.*?</\2>)', re.S | re.I)
+CSS_STRING_RE = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+HTML_COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.S)
+# Whitespace next to these tags never renders, so it can go; elsewhere it collapses to one space
+BLOCK_TAGS = ('html|head|body|meta|link|title|style|main|header|footer|nav|section|article|aside|'
+              'div|p|h[1-6]|ul|ol|li|dl|dt|dd|table|thead|tbody|tr|td|th|form|hr|br|!doctype')
+SPACE_BEFORE_BLOCK_RE = re.compile(rf'\s+(?=</?(?:{BLOCK_TAGS})\b)', re.I)
+SPACE_AFTER_BLOCK_RE = re.compile(rf'(</?(?:{BLOCK_TAGS})\b[^>]*>)\s+', re.I)
+
+# Only worth precompressing files at least this big
+MIN_COMPRESS_BYTES = 256
+
+# Cache headers for hosts that read a _headers file (Netlify, Cloudflare Pages)
+HEADERS_FILE = """/assets/*
+  Cache-Control: public, max-age=31536000, immutable
+/index.html
+  Cache-Control: public, max-age=0, must-revalidate
+"""
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace from CSS, leaving strings untouched"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    parts = CSS_STRING_RE.split(css)
+    for i in range(0, len(parts), 2):
+        part = re.sub(r'\s+', ' ', parts[i])
+        part = re.sub(r'\s*([{};,>])\s*', r'\1', part)
+        # Keep a space before ':' (descendant pseudo-class selectors like `div :hover`)
+        part = re.sub(r':\s+', ':', part)
+        parts[i] = part.replace(';}', '}')
+    return ''.join(parts).strip()
+
+
+def minify_html(html: str) -> str:
+    """
+    Drop comments and collapse whitespace, except inside <pre>/<textarea>/<script>
+
+    Whitespace between inline elements renders as a space, so it is collapsed
+    rather than removed; only whitespace around block-level tags is dropped.
+    """
+    parts = PRESERVE_RE.split(html)
+    out = []
+    # split() yields [text, block, tag name, text, block, tag name, ...]
+    for i in range(0, len(parts), 3):
+        text = HTML_COMMENT_RE.sub('', parts[i])
+        text = SPACE_BEFORE_BLOCK_RE.sub('', text)
+        text = SPACE_AFTER_BLOCK_RE.sub(r'\1', text)
+        out.append(re.sub(r'\s+', ' ', text))
+        if i + 1 < len(parts):
+            out.append(parts[i + 1])
+    return ''.join(out).strip()
+
+
+def build_static_bundle(html: str) -> List[Tuple[str, bytes]]:
+    """
+    Turn a generated portfolio into deployable static files
+
+    Inline <style> blocks move to a content-hashed stylesheet under assets/
+    (safe to cache forever), the HTML is minified, and text files get .gz and,
+    if the brotli package is installed, .br precompressed siblings.
+    """
+    css = minify_css('\n'.join(STYLE_RE.findall(html)))
+    page = STYLE_RE.sub('', html)
+
+    files = []
+    if css:
+        css_name = f'assets/style.{hashlib.sha256(css.encode()).hexdigest()[:10]}.css'
+        link = f'<link rel="stylesheet" href="{css_name}">'
+        if re.search(r'</head>', page, re.I):
+            page = re.sub(r'</head>', link + '</head>', page, count=1, flags=re.I)
+        else:
+            page = link + page
+        files.append((css_name, css.encode('utf-8')))
+
+    files.insert(0, ('index.html', minify_html(page).encode('utf-8')))
+
+    bundle = []
+    for name, data in files:
+        bundle.append((name, data))
+        bundle.extend(precompress(name, data))
+    bundle.append(('_headers', HEADERS_FILE.encode('utf-8')))
+    return bundle
+
+
+def precompress(name: str, data: bytes) -> List[Tuple[str, bytes]]:
+    """gzip (and brotli when available) siblings for a file"""
+    if len(data) < MIN_COMPRESS_BYTES:
+        return []
+
+    # mtime=0 keeps the output byte-identical for identical input
+    siblings = [(name + '.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    try:
+        import brotli
+        siblings.append((name + '.br', brotli.compress(data, quality=11)))
+    except ImportError:
+        pass
+    return siblings
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object that hands out what was written so far"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(files: List[Tuple[str, bytes]]) -> Iterator[bytes]:
+    """
+    Yield a zip archive of `files` chunk by chunk
+
+    The archive is written to a non-seekable sink (zipfile then uses data
+    descriptors) and drained after every member, so it is never held whole.
+    Precompressed members are stored rather than deflated again.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w') as archive:
+        for name, data in files:
+            info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+            info.compress_type = (zipfile.ZIP_STORED if name.endswith(('.gz', '.br'))
+                                  else zipfile.ZIP_DEFLATED)
+            info.external_attr = 0o644 << 16
+            archive.writestr(info, data)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    tail = sink.drain()
+    if tail:
+        yield tail
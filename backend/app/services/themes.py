@@ -0,0 +1,497 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+# Layout shell shared by every theme, seeded from the offline template's CSS.
+# Colours and fonts come from the custom properties each theme defines.
+BASE_CSS = """* {
+    margin: 0;
+    padding: 0;
+    box-sizing: border-box;
+}
+
+body {
+    font-family: var(--font);
+    line-height: 1.6;
+    color: var(--text);
+    background: var(--bg);
+}
+
+header {
+    background: linear-gradient(135deg, var(--primary) 0%, var(--secondary) 100%);
+    color: var(--on-primary);
+    padding: 60px 20px;
+    text-align: center;
+    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+}
+
+header h1 {
+    font-size: 2.5em;
+    margin-bottom: 10px;
+    font-weight: 700;
+}
+
+header p {
+    font-size: 1.1em;
+    opacity: 0.9;
+    margin-bottom: 20px;
+}
+
+.contact-info {
+    display: flex;
+    justify-content: center;
+    gap: 30px;
+    margin-top: 20px;
+    flex-wrap: wrap;
+}
+
+.contact-info span {
+    font-size: 0.95em;
+    opacity: 0.9;
+}
+
+.container {
+    max-width: 900px;
+    margin: 0 auto;
+    padding: 0 20px;
+}
+
+section {
+    background: var(--surface);
+    margin: 40px auto;
+    padding: 40px;
+    border-radius: 8px;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+}
+
+section h2 {
+    color: var(--primary);
+    font-size: 1.8em;
+    margin-bottom: 30px;
+    padding-bottom: 10px;
+    border-bottom: 3px solid var(--primary);
+}
+
+.skill-tags {
+    display: flex;
+    flex-wrap: wrap;
+    gap: 10px;
+    margin-bottom: 10px;
+}
+
+.skill-tag {
+    background: var(--primary);
+    color: var(--on-primary);
+    padding: 8px 15px;
+    border-radius: 20px;
+    font-size: 0.9em;
+    transition: all 0.3s ease;
+}
+
+.skill-tag:hover {
+    background: var(--secondary);
+    transform: translateY(-2px);
+    box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
+}
+
+.experience-item {
+    margin-bottom: 30px;
+    padding-bottom: 20px;
+    border-bottom: 1px solid var(--border);
+}
+
+.experience-item:last-child {
+    border-bottom: none;
+}
+
+.experience-item h3 {
+    color: var(--text);
+    margin-bottom: 5px;
+    font-size: 1.1em;
+}
+
+.experience-item .date {
+    color: var(--muted);
+    font-size: 0.9em;
+    font-style: italic;
+    margin-bottom: 10px;
+}
+
+.about-text {
+    color: var(--muted);
+    line-height: 1.8;
+    margin-bottom: 20px;
+}
+
+footer {
+    background: var(--footer-bg);
+    color: var(--on-primary);
+    text-align: center;
+    padding: 30px 20px;
+    margin-top: 60px;
+}
+
+footer p {
+    margin: 10px 0;
+}
+
+@media (max-width: 768px) {
+    header h1 {
+        font-size: 1.8em;
+    }
+    
+    section {
+        padding: 30px 20px;
+        margin: 30px auto;
+    }
+    
+    .contact-info {
+        flex-direction: column;
+        gap: 15px;
+    }
+    
+    .skill-tags {
+        gap: 8px;
+    }
+    
+    .skill-tag {
+        padding: 6px 12px;
+        font-size: 0.85em;
+    }
+}
+"""
+
+# Extra classes from the content contract (timeline, cards, skill groups)
+CONTRACT_CSS = """
+.timeline {
+    border-left: 3px solid var(--primary);
+    padding-left: 20px;
+}
+
+.skill-group {
+    margin-bottom: 20px;
+}
+
+.skill-group h3 {
+    font-size: 1em;
+    margin-bottom: 10px;
+    color: var(--muted);
+}
+
+.card-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(240px, 1fr));
+    gap: 20px;
+}
+
+.card {
+    border: 1px solid var(--border);
+    border-radius: 8px;
+    padding: 20px;
+    transition: transform 0.3s ease;
+}
+
+.card:hover {
+    transform: translateY(-3px);
+}
+
+.experience-item ul {
+    margin-left: 20px;
+}
+"""
+
+# The markup the model must produce in content mode; theme CSS targets these classes
+CONTENT_STRUCTURE = """<main class="portfolio">
+  <header><h1>Full Name</h1><p>Professional title / tagline</p>
+    <div class="contact-info"><span>email</span><span>phone</span><span>location</span></div></header>
+  <div class="container">
+    <section id="about"><h2>About Me</h2><p class="about-text">...</p></section>
+    <section id="skills"><h2>Skills</h2>
+      <div class="skill-group"><h3>Category</h3><div class="skill-tags"><span class="skill-tag">Skill</span></div></div></section>
+    <section id="experience"><h2>Experience</h2><div class="timeline">
+      <div class="experience-item"><h3>Role - Company</h3><p class="date">Dates</p><ul><li>Achievement</li></ul></div></div></section>
+    <section id="education"><h2>Education</h2><div class="card-grid">
+      <div class="card"><h3>Degree</h3><p class="date">Dates</p><p>Institution</p></div></div></section>
+    <section id="projects"><h2>Projects</h2><div class="card-grid"><div class="card">...</div></div></section>
+  </div>
+  <footer><p>...</p></footer>
+</main>"""
+
+# Selectors a saved LLM design must style to be reusable with contract markup
+CONTRACT_SELECTORS = ['.contact-info', '.container', '.about-text', '.skill-tag',
+                      '.experience-item', '.timeline', '.card', '.date']
+
+STYLE_RE = re.compile(r'<style[^>]*>(.*?)</style>', re.S | re.I)
+
+# Harvested CSS comes from resume-shaped LLM output and is served to other users:
+# anything that fetches a URL, runs script or injects text is removed
+_UNSAFE_CSS = (r'url\s*\(|image-set\s*\(|\bimage\s*\(|cross-fade\s*\(|element\s*\(|expression\s*\('
+               r'|(?<![\w-])behavior\s*:|-moz-binding|javascript\s*:|(?<![\w-])content\s*:')
+UNSAFE_CSS_RE = re.compile(_UNSAFE_CSS + r'|@import|@font-face|@namespace', re.I)
+UNSAFE_AT_RULE_RE = re.compile(r'@(?:import|namespace)[^;{}]*;?|@font-face\s*\{[^}]*\}', re.I)
+UNSAFE_DECLARATION_RE = re.compile(rf'[^;{{}}]*(?:{_UNSAFE_CSS})[^;{{}}]*;?', re.I)
+MAIN_RE = re.compile(r'<main\b.*</main>', re.S | re.I)
+
+
+@dataclass
+class Theme:
+    """Precomputed CSS shell the model fills with content markup"""
+    name: str
+    css: str
+    source: str = 'builtin'
+
+
+def palette_css(primary: str, secondary: str, bg: str, surface: str, text: str, muted: str,
+                border: str, footer_bg: str, font: str, on_primary: str = '#ffffff') -> str:
+    return (f":root {{ --primary: {primary}; --secondary: {secondary}; --bg: {bg}; "
+            f"--surface: {surface}; --text: {text}; --muted: {muted}; --border: {border}; "
+            f"--footer-bg: {footer_bg}; --on-primary: {on_primary}; --font: {font}; }}\n")
+
+
+BUILTIN_PALETTES = {
+    # The offline template's look
+    'classic': (palette_css('#667eea', '#764ba2', '#f4f4f4', 'white', '#333', '#555', '#e0e0e0', '#333',
+                            "'Segoe UI', Tahoma, Geneva, Verdana, sans-serif"), ''),
+    'midnight': (palette_css('#38bdf8', '#6366f1', '#0f172a', '#1e293b', '#e2e8f0', '#94a3b8', '#334155',
+                             '#020617', 'system-ui, -apple-system, sans-serif'),
+                 'section { border-radius: 0; box-shadow: none; border: 1px solid var(--border); }\n'),
+    'forest': (palette_css('#2f855a', '#276749', '#f0fff4', 'white', '#1a202c', '#4a5568', '#c6f6d5',
+                           '#22543d', "Georgia, 'Times New Roman', serif"),
+               'header { text-align: left; padding-left: 10%; }\n'),
+    'sunset': (palette_css('#dd6b20', '#c53030', '#fffaf0', 'white', '#2d3748', '#4a5568', '#feebc8',
+                           '#7b341e', "'Trebuchet MS', Helvetica, sans-serif"),
+               '.skill-tag { border-radius: 4px; }\n'),
+    'minimal': (palette_css('#111827', '#374151', 'white', 'white', '#111827', '#4b5563', '#e5e7eb',
+                            '#111827', "'Helvetica Neue', Arial, sans-serif"),
+                'section { box-shadow: none; border-bottom: 1px solid var(--border); border-radius: 0; }\n'),
+}
+
+
+def builtin_themes() -> Dict[str, Theme]:
+    return {
+        name: Theme(name, palette + BASE_CSS + CONTRACT_CSS + overrides)
+        for name, (palette, overrides) in BUILTIN_PALETTES.items()
+    }
+
+
+# CSS used by the offline template (generate_portfolio_template)
+TEMPLATE_CSS = builtin_themes()['classic'].css
+
+
+def sanitize_css(css: str) -> Optional[str]:
+    """
+    Strip imports, url()/image loads, content: text and script hooks from CSS
+
+    Returns None when the CSS can't be cleaned safely: escapes could spell
+    url( in a way the patterns miss, and '<' could close the <style> block.
+    """
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    if '\\' in css or '<' in css:
+        return None
+    css = UNSAFE_AT_RULE_RE.sub('', css)
+    css = UNSAFE_DECLARATION_RE.sub('', css)
+    if UNSAFE_CSS_RE.search(css):
+        return None
+    return css.strip()
+
+
+def render_theme(theme: Theme, content: str, title: str = 'Professional Portfolio') -> str:
+    """Wrap content markup in the theme's document shell"""
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>
+{theme.css}
+    </style>
+</head>
+<body>
+{content}
+</body>
+</html>"""
+
+
+def extract_content(text: str) -> Optional[str]:
+    """Pull the <main> block out of a content-mode reply (drops fences, stray <style>)"""
+    match = MAIN_RE.search(text or '')
+    if not match:
+        return None
+    return STYLE_RE.sub('', match.group(0))
+
+
+def build_content_prompt(resume_text: str, theme: Theme) -> str:
+    """Content-only prompt: the theme supplies all CSS, the model writes markup"""
+    return f"""You are an expert portfolio writer. Turn this resume into the CONTENT markup of a portfolio website.
+
+Extract: Name, title, email, phone, location, summary, ALL work experience (3-5 achievements each), ALL education, technical skills grouped by category, projects, certifications.
+
+Use EXACTLY this structure and these class names (repeat elements as needed, drop sections the resume has no data for):
+{CONTENT_STRUCTURE}
+
+Rules: NO <style>, NO CSS, NO <html>/<head>/<body>, NO scripts, NO markdown. Output ONLY the <main class="portfolio"> element, ending with </main>.
+The page uses the "{theme.name}" theme; write professional, concise copy.
+
+Resume: {resume_text}"""
+
+
+def build_design_prompt(resume_text: str) -> str:
+    """Full-design prompt whose CSS can be harvested into the library"""
+    return f"""You are an expert web designer. Create an ADVANCED RESPONSIVE HTML5 portfolio that is UNIQUE with enriched modern features.
+
+Extract: Name, title, email, phone, location, summary, ALL work experience (3-5 achievements), ALL education, technical skills grouped by category, projects, certifications.
+
+The <body> MUST contain exactly this structure and these class names (repeat elements as needed):
+{CONTENT_STRUCTURE}
+
+Style it with ONE embedded <style> block that targets these class and element names. Create a DIFFERENT design each time - vary colors, typography and layout (modern minimalist, dark professional, colorful creative, card-based, timeline). Subtle animations, hover effects, fully responsive.
+
+ONLY complete HTML5 with embedded CSS. NO external dependencies, NO images, NO scripts. Starting <!DOCTYPE html>, NO markdown.
+
+Resume: {resume_text}"""
+
+
+class ThemeLibrary:
+    """
+    Cached CSS shells for content-only generation
+
+    Starts with the built-in themes and grows with good full designs produced
+    in explore mode (a share of requests still asks the model for a complete
+    design). A harvested design is shaped by whoever uploaded the resume, so
+    it only becomes pending: it is served to nobody until an admin promotes
+    it (/api/admin/themes). Promoted themes persist as JSON files in
+    `directory`, pending ones in its pending/ subdirectory.
+    """
+
+    def __init__(self, enabled: bool = True, directory: Optional[str] = None,
+                 explore_rate: float = 0.1, max_saved: int = 50, rand: Optional[random.Random] = None):
+        self.enabled = enabled
+        self.directory = directory
+        self.explore_rate = explore_rate
+        self.max_saved = max_saved
+        self.random = rand or random.Random()
+        self._lock = threading.Lock()
+        self.themes: Dict[str, Theme] = builtin_themes()
+        self.pending: Dict[str, Theme] = {}
+        if directory:
+            self._load(self.directory, self.themes)
+            self._load(self._pending_dir(), self.pending)
+
+    def should_explore(self) -> bool:
+        with self._lock:
+            return self.random.random() < self.explore_rate
+
+    def choose(self) -> Theme:
+        with self._lock:
+            return self.random.choice(list(self.themes.values()))
+
+    def save_design(self, html: str) -> Optional[Theme]:
+        """Hold the sanitized CSS of a complete, contract-following LLM design for review"""
+        if not html or '</html>' not in html.lower():
+            return None
+        css = sanitize_css('\n'.join(STYLE_RE.findall(html)))
+        if css is None:
+            print("Theme library: design rejected, unsafe CSS")
+            return None
+        if not 800 <= len(css) <= 40000:
+            return None
+        if sum(selector in css for selector in CONTRACT_SELECTORS) < 5:
+            return None
+
+        name = 'llm-' + hashlib.sha256(css.encode()).hexdigest()[:10]
+        theme = Theme(name, css, source='llm')
+        with self._lock:
+            if name in self.themes or name in self.pending:
+                return None
+            if len(self.pending) >= self.max_saved:
+                return None
+            self.pending[name] = theme
+
+        if self.directory:
+            self._write(self._pending_dir(), theme)
+        print(f"Theme library: design {name} pending review")
+        return theme
+
+    def promote(self, name: str) -> Optional[Theme]:
+        """Move a pending design into the rotation served to everyone"""
+        with self._lock:
+            theme = self.pending.pop(name, None)
+            if theme is None:
+                return None
+            saved = [t for t in self.themes.values() if t.source == 'llm']
+            if len(saved) >= self.max_saved:
+                self._remove(self.directory, self.themes.pop(saved[0].name).name)
+            self.themes[name] = theme
+
+        if self.directory:
+            self._write(self.directory, theme)
+            self._remove(self._pending_dir(), name)
+        print(f"Theme library: promoted design {name}")
+        return theme
+
+    def reject(self, name: str) -> bool:
+        """Drop a pending design"""
+        with self._lock:
+            if self.pending.pop(name, None) is None:
+                return False
+        if self.directory:
+            self._remove(self._pending_dir(), name)
+        return True
+
+    def pending_themes(self) -> List[Theme]:
+        with self._lock:
+            return list(self.pending.values())
+
+    def _pending_dir(self) -> str:
+        return os.path.join(self.directory, 'pending')
+
+    def _write(self, directory: str, theme: Theme) -> None:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f'{theme.name}.json'), 'w', encoding='utf-8') as f:
+            json.dump({'name': theme.name, 'css': theme.css, 'saved_at': time.time()}, f)
+
+    def _remove(self, directory: Optional[str], name: str) -> None:
+        if not directory:
+            return
+        try:
+            os.remove(os.path.join(directory, f'{name}.json'))
+        except FileNotFoundError:
+            pass
+
+    def _load(self, directory: str, themes: Dict[str, Theme]) -> None:
+        if not os.path.isdir(directory):
+            return
+        files = sorted(
+            (os.path.join(directory, f) for f in os.listdir(directory) if f.endswith('.json')),
+            key=os.path.getmtime
+        )
+        for path in files[-self.max_saved:]:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    data = json.load(f)
+                # Re-check on load: files may predate sanitizing or have been edited
+                css = sanitize_css(data['css'])
+                if css is None:
+                    print(f"Theme library: skipping {path}: unsafe CSS")
+                    continue
+                themes[data['name']] = Theme(data['name'], css, source='llm')
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Theme library: skipping {path}: {e}")
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Process-wide library used by generate_portfolio
+theme_library = ThemeLibrary(
+    enabled=os.getenv('THEME_LIBRARY', 'true').lower() == 'true',
+    directory=os.getenv('THEME_LIBRARY_DIR', os.path.join(BACKEND_DIR, 'theme_library')),
+    explore_rate=float(os.getenv('THEME_EXPLORE_RATE', 0.1))
+)
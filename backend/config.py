@@ -10,6 +10,32 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
     ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc', 'txt'}
+    
+    # Admission control: concurrent generations and wait-queue size per lane
+    ADMISSION_LLM_CONCURRENCY = int(os.getenv('ADMISSION_LLM_CONCURRENCY', 8))
+    ADMISSION_LLM_QUEUE = int(os.getenv('ADMISSION_LLM_QUEUE', 16))
+    ADMISSION_OFFLINE_CONCURRENCY = int(os.getenv('ADMISSION_OFFLINE_CONCURRENCY', 32))
+    ADMISSION_OFFLINE_QUEUE = int(os.getenv('ADMISSION_OFFLINE_QUEUE', 64))
+    # Async-mode progressive upgrades (coroutines on the shared event loop)
+    ADMISSION_ASYNC_CONCURRENCY = int(os.getenv('ADMISSION_ASYNC_CONCURRENCY', 256))
+    ADMISSION_ASYNC_QUEUE = int(os.getenv('ADMISSION_ASYNC_QUEUE', 256))
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 10))
+    
+    # Generation job queue shared with worker.py (sqlite:///..., memory://, redis://...)
+    JOB_QUEUE_URL = os.getenv('JOB_QUEUE_URL', 'sqlite:///' + os.path.join(os.path.dirname(__file__), 'jobs.db'))
+    JOB_VISIBILITY_TIMEOUT = float(os.getenv('JOB_VISIBILITY_TIMEOUT', 300))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+    JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', 24 * 60 * 60))  # seconds finished jobs are kept
+    
+    # Opt-in request profiling (X-Profile: 1 header or sampling), listed at /api/admin/profiles
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0.0))
+    PROFILING_MAX_PROFILES = int(os.getenv('PROFILING_MAX_PROFILES', 50))
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+    
+    # Progressive uploads: background LLM threads and the cap on queued + running upgrades
+    PROGRESSIVE_WORKERS = int(os.getenv('PROGRESSIVE_WORKERS', 8))
+    PROGRESSIVE_MAX_PENDING = int(os.getenv('PROGRESSIVE_MAX_PENDING', 32))
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -25,6 +51,7 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     DEBUG = True
+    JOB_QUEUE_URL = 'memory://'
 
 config = {
     'development': DevelopmentConfig,
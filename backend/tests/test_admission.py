@@ -0,0 +1,195 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.admission import AdmissionGate, AdmissionRejected, AsyncLane, Lane
+
+
+class FakeClock:
+    """Clock that moves forward by `step` every time it is read"""
+
+    def __init__(self, now: float = 1000.0, step: float = 0.0):
+        self.now = now
+        self.step = step
+
+    def __call__(self) -> float:
+        now = self.now
+        self.now += self.step
+        return now
+
+
+def make_lane(max_concurrent=1, max_queue=1, queue_timeout=5.0, clock=None, cls=Lane):
+    return cls('llm', max_concurrent, max_queue, queue_timeout, clock=clock or FakeClock(), smoothing=1.0)
+
+
+# Lane: bounded slots and bounded wait queue
+
+def test_free_slot_is_taken_without_waiting():
+    lane = make_lane(max_concurrent=2)
+    assert lane.acquire() == 0
+    assert lane.acquire() == 0
+    stats = lane.stats()
+    assert (stats['active'], stats['admitted'], stats['rejected']) == (2, 2, 0)
+
+
+def test_full_queue_rejects_immediately():
+    lane = make_lane(max_concurrent=1, max_queue=0)
+    lane.acquire()
+    with pytest.raises(AdmissionRejected) as exc:
+        lane.acquire()
+    assert exc.value.lane == 'llm'
+    assert lane.stats()['rejected'] == 1
+    assert lane.stats()['queue_depth'] == 0
+
+
+def test_waiter_is_rejected_when_queue_timeout_passes():
+    # Every clock read advances past the 5s deadline, so the wait times out without sleeping
+    lane = make_lane(max_concurrent=1, max_queue=1, clock=FakeClock(step=5.0))
+    lane.acquire()
+    with pytest.raises(AdmissionRejected):
+        lane.acquire()
+    stats = lane.stats()
+    assert (stats['active'], stats['queue_depth'], stats['rejected']) == (1, 0, 1)
+
+
+def test_waiter_gets_slot_when_one_is_released():
+    lane = Lane('llm', 1, 1, queue_timeout=5.0)
+    lane.acquire()
+    waited = []
+    waiter = threading.Thread(target=lambda: waited.append(lane.acquire()))
+    waiter.start()
+    while lane.stats()['queue_depth'] == 0:
+        time.sleep(0.001)
+
+    lane.release(1.0)
+    waiter.join(5)
+    assert len(waited) == 1 and waited[0] >= 0
+    stats = lane.stats()
+    assert (stats['active'], stats['queue_depth'], stats['admitted']) == (1, 0, 2)
+
+
+def test_slot_records_service_time():
+    clock = FakeClock()
+    lane = make_lane(clock=clock)
+    with lane.slot():
+        clock.now += 12.0
+    stats = lane.stats()
+    assert stats['active'] == 0
+    assert stats['avg_service_seconds'] == pytest.approx(12.0)
+
+
+# Retry-After: average service time scaled by the backlog per slot, clamped to [1, 60]
+
+@pytest.mark.parametrize('avg_service, waiting, expected', [
+    (0.0, 0, 1),
+    (10.0, 0, 5),
+    (10.0, 3, 20),
+    (7.0, 0, 4),
+    (500.0, 0, 60),
+])
+def test_retry_after(avg_service, waiting, expected):
+    lane = make_lane(max_concurrent=2)
+    lane.avg_service = avg_service
+    lane.waiting = waiting
+    assert lane.retry_after() == expected
+
+
+def test_rejection_carries_retry_after():
+    lane = make_lane(max_concurrent=1, max_queue=0)
+    lane.acquire()
+    lane.release(30.0)
+    lane.acquire()
+    with pytest.raises(AdmissionRejected) as exc:
+        lane.acquire()
+    assert exc.value.retry_after == 30
+    assert 'retry in 30s' in str(exc.value)
+
+
+# AsyncLane: admit() reserves a place, slot_async() waits on the event loop
+
+def test_admit_rejects_beyond_concurrency_plus_queue():
+    lane = make_lane(max_concurrent=1, max_queue=1, cls=AsyncLane)
+    lane.admit()
+    lane.admit()
+    with pytest.raises(AdmissionRejected):
+        lane.admit()
+    assert lane.stats()['rejected'] == 1
+
+    lane.withdraw()
+    lane.admit()
+    assert lane.stats()['queue_depth'] == 2
+
+
+def test_slot_async_runs_admitted_coroutines():
+    lane = make_lane(max_concurrent=1, max_queue=1, cls=AsyncLane)
+
+    async def job():
+        async with lane.slot_async():
+            assert lane.stats()['active'] == 1
+            await asyncio.sleep(0)
+
+    async def main():
+        lane.admit()
+        lane.admit()
+        await asyncio.gather(job(), job())
+
+    asyncio.run(main())
+    stats = lane.stats()
+    assert (stats['active'], stats['queue_depth'], stats['admitted']) == (0, 0, 2)
+
+
+def test_slot_async_times_out_while_slots_are_busy():
+    lane = make_lane(max_concurrent=1, max_queue=1, queue_timeout=0.01, cls=AsyncLane)
+
+    async def main():
+        lane.admit()
+        lane.admit()
+        async with lane.slot_async():
+            with pytest.raises(AdmissionRejected):
+                async with lane.slot_async():
+                    pass
+
+    asyncio.run(main())
+    stats = lane.stats()
+    assert (stats['active'], stats['queue_depth'], stats['rejected']) == (0, 0, 1)
+
+
+def test_cancelled_waiter_gives_back_its_place():
+    lane = make_lane(max_concurrent=1, max_queue=1, cls=AsyncLane)
+
+    async def wait_for_slot():
+        async with lane.slot_async():
+            pass
+
+    async def main():
+        lane.admit()
+        lane.admit()
+        async with lane.slot_async():
+            waiter = asyncio.create_task(wait_for_slot())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+    asyncio.run(main())
+    stats = lane.stats()
+    assert (stats['active'], stats['queue_depth'], stats['rejected']) == (0, 0, 0)
+
+
+# AdmissionGate
+
+def test_gate_builds_lanes_from_config():
+    config = {
+        'ADMISSION_QUEUE_TIMEOUT': 3.0,
+        'ADMISSION_OFFLINE_CONCURRENCY': 32, 'ADMISSION_OFFLINE_QUEUE': 64,
+        'ADMISSION_LLM_CONCURRENCY': 8, 'ADMISSION_LLM_QUEUE': 16,
+        'ADMISSION_ASYNC_CONCURRENCY': 256, 'ADMISSION_ASYNC_QUEUE': 128,
+    }
+    gate = AdmissionGate.from_config(config)
+    llm = gate.lane(AdmissionGate.LLM)
+    assert (llm.max_concurrent, llm.max_queue, llm.queue_timeout) == (8, 16, 3.0)
+    assert isinstance(gate.lane(AdmissionGate.LLM_ASYNC), AsyncLane)
+    assert set(gate.stats()) == {'offline', 'llm', 'llm_async'}
+    assert gate.stats()['offline']['max_queue'] == 64
@@ -0,0 +1,59 @@
+import zipfile
+
+from app.services.extraction import extract_docx_text
+
+
+NAMESPACES = ('xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+              'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"')
+
+
+def write_docx(tmp_path, body: str) -> str:
+    path = tmp_path / 'resume.docx'
+    with zipfile.ZipFile(path, 'w') as package:
+        package.writestr('word/document.xml',
+                         f'<?xml version="1.0" encoding="UTF-8"?><w:document {NAMESPACES}>'
+                         f'<w:body>{body}</w:body></w:document>')
+    return str(path)
+
+
+def run(text: str) -> str:
+    return f'<w:r><w:t xml:space="preserve">{text}</w:t></w:r>'
+
+
+def text_box(*paragraphs: str) -> str:
+    content = ''.join(f'<w:p>{run(p)}</w:p>' for p in paragraphs)
+    return f'<w:txbxContent>{content}</w:txbxContent>'
+
+
+def test_paragraphs_breaks_and_run_tabs(tmp_path):
+    body = (f'<w:p>{run("Jane Doe")}</w:p>'
+            f'<w:p>{run("Acme")}<w:r><w:tab/></w:r>{run("2020")}<w:r><w:br/></w:r>{run("Lead")}</w:p>')
+    assert extract_docx_text(write_docx(tmp_path, body)) == 'Jane Doe\nAcme\t2020\nLead\n'
+
+
+def test_tab_stop_definitions_are_not_text(tmp_path):
+    body = ('<w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/><w:tab w:val="right" w:pos="9000"/>'
+            f'</w:tabs></w:pPr>{run("Acme")}<w:r><w:tab/></w:r>{run("2020")}</w:p>')
+    assert extract_docx_text(write_docx(tmp_path, body)) == 'Acme\t2020\n'
+
+
+def test_text_box_is_read_once_from_choice(tmp_path):
+    body = ('<w:p><w:r><mc:AlternateContent>'
+            f'<mc:Choice Requires="wps"><w:drawing>{text_box("Skills: Python", "Go")}</w:drawing></mc:Choice>'
+            f'<mc:Fallback><w:pict>{text_box("Skills: Python", "Go")}</w:pict></mc:Fallback>'
+            '</mc:AlternateContent></w:r></w:p>'
+            f'<w:p>{run("Experience")}</w:p>')
+    assert extract_docx_text(write_docx(tmp_path, body)) == 'Skills: Python\nGo\nExperience\n'
+
+
+def test_text_box_paragraph_tab_stops_are_not_text(tmp_path):
+    nested = ('<w:txbxContent><w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr>'
+              f'{run("Python")}</w:p></w:txbxContent>')
+    body = f'<w:p>{run("Skills:")}<w:r><w:drawing>{nested}</w:drawing></w:r></w:p>'
+    assert extract_docx_text(write_docx(tmp_path, body)) == 'Skills:\nPython\n'
+
+
+def test_table_rows_become_lines(tmp_path):
+    cell = lambda text: f'<w:tc><w:p>{run(text)}</w:p></w:tc>'
+    body = f'<w:tbl><w:tr>{cell("Python")}{cell("5 years")}</w:tr><w:tr>{cell("Go")}{cell("")}</w:tr></w:tbl>'
+    assert extract_docx_text(write_docx(tmp_path, body)) == 'Python | 5 years\nGo\n'
@@ -0,0 +1,165 @@
+import pytest
+
+from app.services.job_queue import DONE, FAILED, QUEUED, RUNNING, RedisJobQueue, SQLiteJobQueue
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def make_queue(request):
+    """Build either backend with an injected clock"""
+    def make(clock, max_attempts=3, result_ttl=3600):
+        if request.param == 'sqlite':
+            return SQLiteJobQueue(':memory:', max_attempts=max_attempts, result_ttl=result_ttl, clock=clock)
+        fakeredis = pytest.importorskip('fakeredis')
+        return RedisJobQueue('redis://fake', max_attempts=max_attempts, result_ttl=result_ttl, clock=clock,
+                             client=fakeredis.FakeRedis(decode_responses=True))
+    return make
+
+
+def test_jobs_are_delivered_in_order_once(make_queue):
+    queue = make_queue(FakeClock())
+    first = queue.enqueue({'n': 1})
+    second = queue.enqueue({'n': 2})
+    assert queue.get(first)['status'] == QUEUED
+
+    job = queue.dequeue(visibility_timeout=60)
+    assert (job.id, job.payload, job.attempts) == (first, {'n': 1}, 1)
+    assert queue.get(first)['status'] == RUNNING
+    assert queue.dequeue(visibility_timeout=60).id == second
+    assert queue.dequeue(visibility_timeout=60) is None
+
+
+def test_completed_job_keeps_result_and_is_not_redelivered(make_queue):
+    clock = FakeClock()
+    queue = make_queue(clock)
+    job_id = queue.enqueue({'n': 1})
+    queue.complete(queue.dequeue(visibility_timeout=60).id, '<html></html>')
+
+    clock.now += 120
+    assert queue.dequeue(visibility_timeout=60) is None
+    job = queue.get(job_id)
+    assert (job['status'], job['result'], job['attempts']) == (DONE, '<html></html>', 1)
+
+
+def test_unfinished_job_is_redelivered_after_visibility_timeout(make_queue):
+    clock = FakeClock()
+    queue = make_queue(clock)
+    job_id = queue.enqueue({'n': 1})
+    assert queue.dequeue(visibility_timeout=60).id == job_id
+
+    clock.now += 59
+    assert queue.dequeue(visibility_timeout=60) is None
+    clock.now += 1
+    job = queue.dequeue(visibility_timeout=60)
+    assert (job.id, job.payload, job.attempts) == (job_id, {'n': 1}, 2)
+
+
+def test_job_fails_after_max_attempts(make_queue):
+    clock = FakeClock()
+    queue = make_queue(clock, max_attempts=2)
+    job_id = queue.enqueue({'n': 1})
+    for _ in range(2):
+        assert queue.dequeue(visibility_timeout=60).id == job_id
+        clock.now += 61
+
+    assert queue.dequeue(visibility_timeout=60) is None
+    job = queue.get(job_id)
+    assert job['status'] == FAILED
+    assert 'max delivery attempts' in job['error']
+
+
+def test_failed_job_is_not_redelivered(make_queue):
+    clock = FakeClock()
+    queue = make_queue(clock)
+    job_id = queue.enqueue({'n': 1})
+    queue.fail(queue.dequeue(visibility_timeout=60).id, 'boom')
+    clock.now += 120
+    assert queue.dequeue(visibility_timeout=60) is None
+    assert queue.get(job_id)['error'] == 'boom'
+
+
+def test_tracked_jobs_are_never_dequeued(make_queue):
+    clock = FakeClock()
+    queue = make_queue(clock)
+    upgrade_id = queue.track()
+    clock.now += 600
+    assert queue.dequeue(visibility_timeout=60) is None
+    assert queue.get(upgrade_id)['status'] == RUNNING
+
+    queue.complete(upgrade_id, '<html></html>')
+    assert queue.get(upgrade_id)['status'] == DONE
+
+
+def test_stats_report_depth_and_inflight(make_queue):
+    clock = FakeClock()
+    queue = make_queue(clock)
+    for n in range(3):
+        queue.enqueue({'n': n})
+    queue.dequeue(visibility_timeout=60)
+    stats = queue.stats()
+    assert (stats['queued'], stats['inflight']) == (2, 1)
+
+
+# SQLite retention (Redis expires keys itself)
+
+def test_sqlite_purges_finished_and_abandoned_rows_after_ttl():
+    clock = FakeClock()
+    queue = SQLiteJobQueue(':memory:', result_ttl=3600, clock=clock)
+    done = queue.enqueue({'n': 1})
+    queue.complete(queue.dequeue(visibility_timeout=60).id, '<html></html>')
+    abandoned = queue.track()
+    clock.now += 1800
+    finished_later = queue.track()
+    queue.fail(finished_later, 'LLM generation unavailable')
+
+    clock.now += 1800
+    queue.enqueue({'n': 2})
+    assert queue.get(done) is None
+    assert queue.get(abandoned) is None
+    assert queue.get(finished_later)['status'] == FAILED
+    assert queue.stats() == {'queued': 1, 'inflight': 0, 'tracked': 0}
+
+    clock.now += 1800
+    queue.dequeue(visibility_timeout=60)
+    assert queue.get(finished_later) is None
+
+
+def test_sqlite_keeps_long_queued_jobs():
+    clock = FakeClock()
+    queue = SQLiteJobQueue(':memory:', result_ttl=3600, clock=clock)
+    job_id = queue.enqueue({'n': 1})
+    clock.now += 7200
+    assert queue.dequeue(visibility_timeout=60).id == job_id
+
+
+# Redis claim script
+
+def test_redis_drops_ids_whose_job_hash_expired():
+    fakeredis = pytest.importorskip('fakeredis')
+    client = fakeredis.FakeRedis(decode_responses=True)
+    queue = RedisJobQueue('redis://fake', clock=FakeClock(), client=client)
+    stale = queue.enqueue({'n': 1})
+    live = queue.enqueue({'n': 2})
+    client.delete(queue._job_key(stale))
+
+    job = queue.dequeue(visibility_timeout=60)
+    assert job.id == live
+    assert not client.exists(queue._job_key(stale))
+    assert queue.dequeue(visibility_timeout=60) is None
+
+
+def test_redis_finished_jobs_expire():
+    fakeredis = pytest.importorskip('fakeredis')
+    client = fakeredis.FakeRedis(decode_responses=True)
+    queue = RedisJobQueue('redis://fake', result_ttl=3600, clock=FakeClock(), client=client)
+    job_id = queue.enqueue({'n': 1})
+    queue.complete(queue.dequeue(visibility_timeout=60).id, '<html></html>')
+    assert 0 < client.ttl(queue._job_key(job_id)) <= 3600
+    assert 0 < client.ttl(queue._job_key(queue.track())) <= 3600
@@ -0,0 +1,217 @@
+import pytest
+
+from app.services.model_router import DAY_SECONDS, ModelRouter, ProviderProfile, output_budget
+from app.services.retry import ProviderError, RetryableError, is_client_error
+
+
+RESUME = "Jane Doe\nBackend engineer\nPython, Go, PostgreSQL\n" * 20
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_router(providers=None, env=None, clock=None, **weights):
+    weights.setdefault('cost_weight', 0.0)
+    weights.setdefault('latency_weight', 1.0)
+    weights.setdefault('error_weight', 10.0)
+    return ModelRouter(providers, clock=clock or FakeClock(), env=env or {}, smoothing=0.5, **weights)
+
+
+def profile(name, **kwargs):
+    kwargs.setdefault('expected_latency', 10.0)
+    return ProviderProfile(name, f'{name}-model', f'{name.upper()}_API_KEY', **kwargs)
+
+
+# Key-based filtering
+
+@pytest.mark.parametrize('api_key, expected', [
+    ('gsk_' + 'a' * 52, ['groq']),
+    ('AIza' + 'b' * 35, ['gemini']),
+    ('sk-proj-' + 'c' * 48, ['openai']),
+    ('sk-' + '0123456789abcdef' * 2, ['alibaba']),
+    # Unrecognised keys (e.g. Euron.ai) only go to providers without a key pattern
+    ('euri-' + 'd' * 40, ['euron']),
+])
+def test_candidates_follow_key_pattern(api_key, expected):
+    router = make_router()
+    assert [p.name for p in router.candidates(api_key)] == expected
+
+
+def test_candidates_without_key_use_environment():
+    router = make_router(env={'GROQ_API_KEY': 'gsk_x', 'ALIBABA_API_KEY': 'sk-y'})
+    assert [p.name for p in router.candidates()] == ['groq', 'alibaba']
+
+
+def test_unknown_key_is_not_routed_when_every_provider_has_a_pattern():
+    router = make_router([profile('a', key_pattern='a_'), profile('b', key_pattern='b_')])
+    assert router.candidates('c_key') == []
+    assert router.choose(RESUME, 'c_key') is None
+
+
+# Scoring
+
+def test_latency_is_exponentially_weighted():
+    router = make_router([profile('a')])
+    router.record('a-model', 20.0, True)
+    assert router.snapshot()['a']['latency'] == pytest.approx(15.0)
+    router.record('a-model', 20.0, True)
+    assert router.snapshot()['a']['latency'] == pytest.approx(17.5)
+
+
+def test_failures_raise_error_rate_but_not_latency():
+    router = make_router([profile('a')])
+    router.record('a-model', 60.0, False)
+    stats = router.snapshot()['a']
+    assert stats['error_rate'] == pytest.approx(0.5)
+    assert stats['latency'] == pytest.approx(10.0)
+
+    router.record('a-model', 10.0, True)
+    assert router.snapshot()['a']['error_rate'] == pytest.approx(0.25)
+
+
+def test_errors_steer_routing_to_another_provider():
+    providers = [profile('a', key_pattern='k'), profile('b', key_pattern='k', expected_latency=12.0)]
+    router = make_router(providers)
+    assert router.choose(RESUME, 'key').provider == 'a'
+
+    router.record('a-model', 10.0, False)
+    route = router.choose(RESUME, 'key')
+    assert route.provider == 'b'
+    assert route.scores == {'a': pytest.approx(15.0), 'b': pytest.approx(12.0)}
+
+
+def test_demoted_provider_recovers_as_observations_decay():
+    clock = FakeClock()
+    providers = [profile('a', key_pattern='k'), profile('b', key_pattern='k', expected_latency=12.0)]
+    router = make_router(providers, clock=clock, decay_half_life=600)
+    router.record('a-model', 10.0, False)
+    router.record('a-model', 10.0, False)
+    assert router.choose(RESUME, 'key').provider == 'b'
+
+    # Error rate 0.75 (score 17.5) halves every 10 minutes: b still wins after 10, a after 20
+    clock.now += 600
+    assert router.choose(RESUME, 'key').provider == 'b'
+    clock.now += 600
+    route = router.choose(RESUME, 'key')
+    assert route.provider == 'a'
+    assert route.scores['a'] == pytest.approx(10.0 + 10 * 0.75 / 4)
+
+
+def test_latency_decays_toward_prior():
+    clock = FakeClock()
+    router = make_router([profile('a')], clock=clock, decay_half_life=100)
+    router.record('a-model', 30.0, True)
+    assert router.snapshot()['a']['latency'] == pytest.approx(20.0)
+    clock.now += 100
+    router.record('a-model', 15.0, True)
+    # 20 -> 15 after one half-life, then blended with the new 15s observation
+    assert router.snapshot()['a']['latency'] == pytest.approx(15.0)
+
+
+def test_ties_go_to_the_first_provider():
+    providers = [profile('b', key_pattern='k'), profile('a', key_pattern='k'), profile('c', key_pattern='k')]
+    router = make_router(providers)
+    for _ in range(3):
+        assert router.choose(RESUME, 'key').provider == 'b'
+
+
+def test_cost_is_part_of_the_score():
+    providers = [profile('pricey', key_pattern='k', cost_out=10.0), profile('cheap', key_pattern='k')]
+    router = make_router(providers, cost_weight=1.0, latency_weight=0.0)
+    assert router.choose(RESUME, 'key').provider == 'cheap'
+
+
+# Daily quota
+
+def test_quota_exhaustion_skips_provider_until_window_rolls_over():
+    clock = FakeClock()
+    providers = [profile('free', key_pattern='k', daily_token_quota=10000),
+                 profile('paid', key_pattern='k', expected_latency=30.0)]
+    router = make_router(providers, clock=clock, decay_half_life=0)
+    route = router.choose(RESUME, 'key')
+    assert route.provider == 'free'
+
+    router.record('free-model', 10.0, True, tokens=9000, reserved=route.reserved)
+    assert router.remaining_quota(providers[0]) == 1000
+    route = router.choose(RESUME, 'key')
+    assert route.provider == 'paid'
+    router.release(route.model, route.reserved)
+
+    clock.now += DAY_SECONDS - 1
+    route = router.choose(RESUME, 'key')
+    assert route.provider == 'paid'
+    router.release(route.model, route.reserved)
+    assert router.remaining_quota(providers[0]) == 1000
+
+    clock.now += 1
+    assert router.remaining_quota(providers[0]) == 10000
+    assert router.choose(RESUME, 'key').provider == 'free'
+
+
+def test_chosen_routes_reserve_quota_until_recorded():
+    providers = [profile('free', key_pattern='k', daily_token_quota=10000),
+                 profile('paid', key_pattern='k', expected_latency=30.0)]
+    router = make_router(providers)
+    routes = [router.choose(RESUME, 'key') for _ in range(8)]
+
+    free = [r for r in routes if r.provider == 'free']
+    assert 0 < len(free) < 8
+    assert sum(r.reserved for r in free) <= 10000
+    assert router.remaining_quota(providers[0]) == 10000 - sum(r.reserved for r in free)
+
+    # Settling replaces each reservation with the tokens actually used
+    for route in free:
+        router.record(route.model, 10.0, True, tokens=500, reserved=route.reserved)
+    assert router.remaining_quota(providers[0]) == 10000 - 500 * len(free)
+
+
+def test_release_returns_reservation():
+    providers = [profile('free', key_pattern='k', daily_token_quota=10000)]
+    router = make_router(providers)
+    route = router.choose(RESUME, 'key')
+    assert router.remaining_quota(providers[0]) == 10000 - route.reserved
+    router.release(route.model, route.reserved)
+    assert router.remaining_quota(providers[0]) == 10000
+    assert router.snapshot()['free']['calls'] == 0
+
+
+def test_quota_override_from_env():
+    providers = [profile('free', key_pattern='k', daily_token_quota=10000)]
+    router = make_router(providers, env={'ROUTER_QUOTA_FREE': '100'})
+    assert router.remaining_quota(providers[0]) == 100
+    assert router.choose(RESUME, 'key') is None
+
+
+def test_route_budget_is_capped_by_provider():
+    router = make_router([profile('small', key_pattern='k', max_output_tokens=2048)])
+    route = router.choose(RESUME * 20, 'key')
+    assert route.max_tokens == 2048 == output_budget(RESUME * 20, 2048)
+
+
+# Client errors (bad key, bad request) are not provider failures
+
+@pytest.mark.parametrize('exc, expected', [
+    (ProviderError('bad key', 401), True),
+    (ProviderError('bad request', 400), True),
+    (ProviderError('not implemented', 501), False),
+    (ProviderError('unknown'), False),
+    (RetryableError('rate limited'), False),
+])
+def test_is_client_error(exc, expected):
+    assert is_client_error(exc) is expected
+
+
+def test_is_client_error_reads_sdk_status_code():
+    class AuthenticationError(Exception):
+        status_code = 401
+
+    class RateLimitError(Exception):
+        status_code = 429
+
+    assert is_client_error(AuthenticationError())
+    assert not is_client_error(RateLimitError())
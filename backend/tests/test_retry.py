@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from app.services.llm_service import complete_document, document_steps
+from app.services.retry import RetryableError, call_with_retry, generation_deadline, time_left
+
+
+def flaky(failures, result='ok'):
+    """fn that raises RetryableError `failures` times, then returns `result`"""
+    calls = []
+
+    def fn():
+        calls.append(time.monotonic())
+        if len(calls) <= failures:
+            raise RetryableError('busy')
+        return result
+    fn.calls = calls
+    return fn
+
+
+def test_retries_transient_errors():
+    fn = flaky(2)
+    assert call_with_retry(fn, attempts=3, base_delay=0.01, max_delay=0.01, sleep=lambda s: None) == 'ok'
+    assert len(fn.calls) == 3
+
+
+def test_no_retry_when_backoff_would_pass_deadline():
+    fn = flaky(1)
+    slept = []
+    with pytest.raises(RetryableError):
+        call_with_retry(fn, attempts=3, base_delay=5, max_delay=5, rand=lambda: 1.0,
+                        sleep=slept.append, deadline=time.monotonic() + 2)
+    assert len(fn.calls) == 1 and slept == []
+
+
+def test_retry_within_deadline():
+    fn = flaky(1)
+    assert call_with_retry(fn, attempts=3, base_delay=0.5, max_delay=0.5, rand=lambda: 1.0,
+                           sleep=lambda s: None, deadline=time.monotonic() + 60) == 'ok'
+
+
+def test_time_left():
+    assert time_left(None) is None
+    assert time_left(time.monotonic() - 1) == 0
+    assert 59 < time_left(generation_deadline(60)) <= 60
+
+
+def test_generation_deadline_from_env(monkeypatch):
+    monkeypatch.setenv('LLM_TOTAL_TIMEOUT', '10')
+    assert 9 < generation_deadline() - time.monotonic() <= 10
+
+
+# Continuations stop at the deadline
+
+def test_truncated_output_is_continued():
+    replies = iter([('<html><body>part one', 'length'), (' part two</body></html>', 'stop')])
+    html = complete_document(lambda messages, max_tokens: next(replies), 'prompt', 100,
+                             max_continuations=2)
+    assert html == '<html><body>part one part two</body></html>'
+
+
+def test_no_continuation_past_deadline():
+    sent = []
+
+    def send(messages, max_tokens):
+        sent.append(messages)
+        return '<html><body>part one', 'length'
+
+    html = complete_document(send, 'prompt', 100, max_continuations=2, deadline=time.monotonic() - 1)
+    assert html == '<html><body>part one'
+    assert len(sent) == 1
+
+
+def test_document_steps_stops_when_out_of_time():
+    steps = document_steps('prompt', max_continuations=5, out_of_time=lambda: True)
+    assert next(steps) == [{'role': 'user', 'content': 'prompt'}]
+    with pytest.raises(StopIteration) as done:
+        steps.send(('<html>cut', 'length'))
+    assert done.value.value == '<html>cut'
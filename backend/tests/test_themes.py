@@ -0,0 +1,119 @@
+import random
+
+import pytest
+
+from app.services.themes import CONTRACT_SELECTORS, ThemeLibrary, builtin_themes, sanitize_css
+
+
+SAFE_RULE = '.card { color: #333; padding: 10px; }'
+
+
+# sanitize_css: the boundary between LLM output and CSS served to other users
+
+@pytest.mark.parametrize('css', [
+    '@import "https://evil.example/x.css";',
+    "@import url(https://evil.example/x.css);",
+    '@namespace svg url(http://www.w3.org/2000/svg);',
+    '@font-face { font-family: x; src: url(https://evil.example/f.woff); }',
+])
+def test_unsafe_at_rules_are_stripped(css):
+    cleaned = sanitize_css(css + '\n' + SAFE_RULE)
+    assert cleaned == SAFE_RULE
+
+
+@pytest.mark.parametrize('declaration', [
+    'background: url(https://evil.example/track.gif)',
+    'background-image: URL( "https://evil.example/a.png" )',
+    'background-image: image-set("https://evil.example/a.png" 1x)',
+    'background-image: -webkit-image-set(url(a.png) 1x)',
+    'width: expression(alert(1))',
+    'behavior: foo.htc',
+    '-moz-binding: none',
+    'content: "Call 555-0100 for a better job"',
+])
+def test_unsafe_declarations_are_stripped(declaration):
+    cleaned = sanitize_css(f'.card {{ {declaration}; color: red; }}')
+    assert cleaned is not None
+    assert 'evil' not in cleaned and 'content' not in cleaned and '(' not in cleaned
+    assert 'color: red' in cleaned
+
+
+@pytest.mark.parametrize('css', [
+    r'.card { background: u\rl(https://evil.example/a.png); }',
+    r'.card { background: \75 rl(https://evil.example/a.png); }',
+    r'.card::after { c\ontent: "x"; }',
+    '.card { color: red; } </style><script>alert(1)</script>',
+    '.card { color: red; } </STYLE ',
+])
+def test_escapes_and_markup_are_rejected(css):
+    assert sanitize_css(css) is None
+
+
+def test_comments_cannot_hide_unsafe_tokens():
+    cleaned = sanitize_css('.card { background: u/**/rl(https://evil.example/a.png); color: red; }')
+    assert 'evil' not in cleaned and 'color: red' in cleaned
+
+
+def test_content_property_name_suffixes_are_kept():
+    css = '.timeline { align-content: center; justify-content: space-between; }'
+    assert sanitize_css(css) == css
+
+
+def test_builtin_themes_pass_unchanged():
+    for theme in builtin_themes().values():
+        assert sanitize_css(theme.css) == theme.css.strip()
+
+
+# Harvested designs are held for review, never served straight away
+
+def design_html(extra: str = '') -> str:
+    rules = '\n'.join(f'{selector} {{ margin: 4px; padding: 8px; color: #123456; }}'
+                      for selector in CONTRACT_SELECTORS)
+    css = rules + '\n' + ('.filler { border: 1px solid #ccc; }\n' * 20) + extra
+    return f'<!DOCTYPE html><html><head><style>{css}</style></head><body></body></html>'
+
+
+def make_library(tmp_path):
+    return ThemeLibrary(directory=str(tmp_path), rand=random.Random(1))
+
+
+def test_saved_design_is_pending_until_promoted(tmp_path):
+    library = make_library(tmp_path)
+    theme = library.save_design(design_html())
+    assert theme is not None
+    assert theme.name not in library.themes
+    assert all(library.choose().source == 'builtin' for _ in range(50))
+    assert (tmp_path / 'pending' / f'{theme.name}.json').exists()
+
+    assert library.promote(theme.name) is theme
+    assert library.themes[theme.name] is theme
+    assert library.pending_themes() == []
+    assert (tmp_path / f'{theme.name}.json').exists()
+    assert not (tmp_path / 'pending' / f'{theme.name}.json').exists()
+
+
+def test_pending_and_promoted_themes_survive_restart(tmp_path):
+    library = make_library(tmp_path)
+    promoted = library.save_design(design_html())
+    library.promote(promoted.name)
+    pending = library.save_design(design_html('.extra { color: #654321; }'))
+
+    reloaded = make_library(tmp_path)
+    assert promoted.name in reloaded.themes
+    assert pending.name not in reloaded.themes
+    assert [t.name for t in reloaded.pending_themes()] == [pending.name]
+
+
+def test_rejected_design_is_dropped(tmp_path):
+    library = make_library(tmp_path)
+    theme = library.save_design(design_html())
+    assert library.reject(theme.name)
+    assert not library.reject(theme.name)
+    assert library.promote(theme.name) is None
+    assert not (tmp_path / 'pending' / f'{theme.name}.json').exists()
+
+
+def test_unsafe_design_is_not_kept(tmp_path):
+    library = make_library(tmp_path)
+    assert library.save_design(design_html('.card { background: u\\rl(x.png); }')) is None
+    assert library.pending_themes() == []
@@ -0,0 +1,89 @@
+"""
+Benchmark DOCX extraction: streaming reader vs python-docx
+
+    python -m tools.bench_docx --sizes 100 1000 10000 --repeat 5
+
+Builds synthetic resumes with paragraphs and skills/experience tables, then
+reports time per extraction, tracemalloc peak and how many table cells each
+path recovered.
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from xml.sax.saxutils import escape
+
+from app.services.extraction import extract_docx_text, extract_docx_text_python_docx
+from tools.loadtest import make_docx
+
+
+def make_large_docx(paragraphs: int) -> bytes:
+    """DOCX with `paragraphs` paragraphs and a 3-column table after every 20"""
+    def para(text):
+        return f'<w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+    def table(index):
+        rows = ''.join(
+            '<w:tr>' + ''.join(f'<w:tc>{para(f"cell {index}.{r}.{c}")}</w:tc>' for c in range(3)) + '</w:tr>'
+            for r in range(4)
+        )
+        return f'<w:tbl>{rows}</w:tbl>'
+
+    blocks = []
+    for i in range(paragraphs):
+        blocks.append(para(f'Paragraph {i}: led a team of engineers delivering projects on time.'))
+        if i % 20 == 19:
+            blocks.append(table(i))
+
+    # Reuse the package skeleton from the load-test fixture, swapping in the body
+    skeleton = zipfile.ZipFile(io.BytesIO(make_docx()))
+    document = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                f'<w:body>{"".join(blocks)}</w:body></w:document>')
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as z:
+        for name in skeleton.namelist():
+            z.writestr(name, document if name == 'word/document.xml' else skeleton.read(name))
+    return out.getvalue()
+
+
+def measure(fn, filepath, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        text = fn(filepath)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    fn(filepath)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark DOCX extraction paths')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    paths = [('streaming', extract_docx_text), ('python-docx', extract_docx_text_python_docx)]
+    print(f"{'paragraphs':>10} {'path':>12} {'best ms':>10} {'peak KiB':>10} {'cells':>7}")
+    for size in args.sizes:
+        fd, filepath = tempfile.mkstemp(suffix='.docx')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(make_large_docx(size))
+            for name, fn in paths:
+                best, peak, text = measure(fn, filepath, args.repeat)
+                print(f"{size:>10} {name:>12} {best * 1000:>10.1f} {peak / 1024:>10.0f} "
+                      f"{text.count('cell '):>7}")
+        finally:
+            os.remove(filepath)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+"""
+Load test for POST /api/upload, fully offline
+
+Replays a mix of TXT/PDF/DOCX resumes at a given concurrency. By default it
+starts the Flask app and a mock LLM server (tools/mock_llm.py) in-process and
+points the provider base URLs at the mock, so no network or API keys are needed.
+
+    python -m tools.loadtest --requests 200 --concurrency 20 --latency 2 --rate-limit-rate 0.1
+
+Use --url to target an already running server instead (its provider base
+URLs must then be pointed at a mock server by its own environment).
+"""
+import argparse
+import io
+import math
+import os
+import threading
+import time
+import zipfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from tools.mock_llm import MOCK_MARKER, MockLLMServer, add_mock_arguments, settings_from_args
+
+
+SAMPLE_RESUME = """Jane Doe
+jane.doe@example.com
+(555) 123-4567
+Summary
+Backend engineer with 8 years of experience building APIs.
+Experience
+Senior Engineer at Acme Corp, 2019-2024. Led migration to Kubernetes.
+Engineer at Initech, 2016-2019. Built billing pipeline.
+Education
+B.Sc. Computer Science, State University, 2016
+Skills
+Python, Go, PostgreSQL, Redis, Docker, Kubernetes, Flask, React
+"""
+
+
+def make_txt(text: str = SAMPLE_RESUME) -> bytes:
+    return text.encode('utf-8')
+
+
+def make_pdf(text: str = SAMPLE_RESUME) -> bytes:
+    """Minimal single-page PDF with a text stream PyPDF2 can extract"""
+    def escape(line):
+        return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+    lines = ['BT /F1 11 Tf 50 750 Td 14 TL']
+    lines += [f'({escape(line)}) Tj T*' for line in text.splitlines()]
+    lines.append('ET')
+    stream = '\n'.join(lines).encode('latin-1', 'replace')
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+        b'/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>',
+        b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b'%d 0 obj\n' % number + body + b'\nendobj\n')
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b'%010d 00000 n \n' % offset)
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+              % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def make_docx(text: str = SAMPLE_RESUME) -> bytes:
+    """Minimal DOCX (one paragraph per line) that Word and python-docx can open"""
+    from xml.sax.saxutils import escape
+
+    paragraphs = ''.join(f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>'
+                         for line in text.splitlines())
+    document = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                f'<w:body>{paragraphs}</w:body></w:document>')
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/></Types>')
+    rels = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+            'relationships/officeDocument" Target="word/document.xml"/></Relationships>')
+
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as z:
+        z.writestr('[Content_Types].xml', content_types)
+        z.writestr('_rels/.rels', rels)
+        z.writestr('word/document.xml', document)
+    return out.getvalue()
+
+
+FIXTURES = {'txt': make_txt, 'pdf': make_pdf, 'docx': make_docx}
+
+
+@dataclass
+class Result:
+    kind: str
+    status: int
+    latency: float
+    fallback: bool = False
+    error: Optional[str] = None
+
+
+def parse_mix(mix: str) -> List[str]:
+    """'txt=5,pdf=3,docx=2' -> weighted list of file kinds"""
+    kinds = []
+    for part in mix.split(','):
+        kind, _, weight = part.partition('=')
+        if kind.strip() not in FIXTURES:
+            raise ValueError(f"Unknown file type in mix: {kind}")
+        kinds += [kind.strip()] * int(weight or 1)
+    return kinds
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    # Nearest-rank percentile
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_load(url: str, total: int, concurrency: int, mix: List[str], model: str,
+             api_key: str, timeout: float = 120, repeat_payloads: bool = False) -> List[Result]:
+    """
+    Fire `total` uploads at `url` with `concurrency` in flight
+
+    Each request gets a unique resume (its index is appended) so the
+    server's extraction cache misses and PDF/DOCX parsing is measured;
+    `repeat_payloads` sends identical bytes per type to measure cache hits.
+    """
+    import requests
+
+    payloads = {kind: FIXTURES[kind]() for kind in set(mix)}
+    session_local = threading.local()
+
+    def one(i: int) -> Result:
+        kind = mix[i % len(mix)]
+        session = getattr(session_local, 'session', None)
+        if session is None:
+            session = session_local.session = requests.Session()
+
+        if repeat_payloads:
+            content = payloads[kind]
+        else:
+            content = FIXTURES[kind](SAMPLE_RESUME + f'Reference: load-test request {i}\n')
+
+        started = time.perf_counter()
+        try:
+            response = session.post(
+                f'{url}/api/upload',
+                files={'resume': (f'resume-{i}.{kind}', content)},
+                data={'model': model, 'api_key': api_key},
+                timeout=timeout,
+            )
+            latency = time.perf_counter() - started
+            if response.status_code != 200:
+                return Result(kind, response.status_code, latency, error=response.text[:200])
+            portfolio = response.json().get('portfolio', '')
+            return Result(kind, 200, latency, fallback=MOCK_MARKER not in portfolio)
+        except Exception as e:
+            return Result(kind, 0, time.perf_counter() - started, error=str(e))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, range(total)))
+
+
+def summarize(results: List[Result], elapsed: float) -> Dict:
+    latencies = [r.latency for r in results]
+    ok = [r for r in results if r.status == 200]
+    statuses = Counter(r.status for r in results)
+    return {
+        'requests': len(results),
+        'elapsed_seconds': round(elapsed, 2),
+        'throughput_rps': round(len(results) / elapsed, 2) if elapsed else 0,
+        'latency_p50': round(percentile(latencies, 50), 3),
+        'latency_p90': round(percentile(latencies, 90), 3),
+        'latency_p95': round(percentile(latencies, 95), 3),
+        'latency_p99': round(percentile(latencies, 99), 3),
+        'latency_max': round(max(latencies, default=0), 3),
+        'error_rate': round(1 - len(ok) / len(results), 4) if results else 0,
+        'rejected_503_rate': round(statuses.get(503, 0) / len(results), 4) if results else 0,
+        'fallback_rate': round(sum(r.fallback for r in ok) / len(ok), 4) if ok else 0,
+        'status_counts': dict(statuses),
+        'by_type': {
+            kind: {
+                'count': len(rs),
+                'latency_p50': round(percentile([r.latency for r in rs], 50), 3),
+                'latency_p99': round(percentile([r.latency for r in rs], 99), 3),
+            }
+            for kind in sorted({r.kind for r in results})
+            for rs in [[r for r in results if r.kind == kind]]
+        },
+    }
+
+
+def start_local_app(mock_url: str):
+    """Start the Flask app in-process with provider base URLs pointed at the mock"""
+    import logging
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    for name in ('EURON_BASE_URL', 'OPENAI_BASE_URL', 'GROQ_BASE_URL',
+                 'TOGETHER_BASE_URL', 'DASHSCOPE_BASE_URL'):
+        os.environ[name] = mock_url
+    os.environ['USE_LLM_API'] = 'true'
+
+    from app import create_app
+    app = create_app('production')
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def print_report(summary: Dict) -> None:
+    for key, value in summary.items():
+        if isinstance(value, dict):
+            print(f'{key}:')
+            for sub_key, sub_value in value.items():
+                print(f'  {sub_key}: {sub_value}')
+        else:
+            print(f'{key}: {value}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Offline load test for /api/upload')
+    parser.add_argument('--url', help='target server (default: start app + mock in-process)')
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--mix', default='txt=4,pdf=4,docx=2', help='weighted file types')
+    parser.add_argument('--model', default='euron:gpt-4.1-nano',
+                        help='model to request (euron/together/qwen need no SDK)')
+    parser.add_argument('--api-key', default='mock-key')
+    parser.add_argument('--repeat-payloads', action='store_true',
+                        help='send identical files per type (extraction cache hits) instead of unique ones')
+    add_mock_arguments(parser)
+    args = parser.parse_args(argv)
+
+    mock = server = None
+    url = args.url
+    if url is None:
+        mock = MockLLMServer(settings_from_args(args)).start()
+        server, url = start_local_app(mock.url)
+        print(f'Mock LLM on {mock.url}, app on {url}')
+
+    try:
+        started = time.perf_counter()
+        results = run_load(url.rstrip('/'), args.requests, args.concurrency,
+                           parse_mix(args.mix), args.model, args.api_key,
+                           repeat_payloads=args.repeat_payloads)
+        summary = summarize(results, time.perf_counter() - started)
+        if mock is not None:
+            summary['mock_provider'] = dict(mock.counts)
+        print_report(summary)
+        return summary
+    finally:
+        if server is not None:
+            server.shutdown()
+        if mock is not None:
+            mock.stop()
+
+
+if __name__ == '__main__':
+    main()
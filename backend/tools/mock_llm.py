@@ -0,0 +1,199 @@
+"""
+Offline mock of the LLM provider APIs used by llm_service.py
+
+Speaks just enough of the OpenAI-compatible chat API (Euron, OpenAI, Groq),
+Together's /inference and DashScope's generation endpoint to exercise the
+service under load, with configurable latency, 5xx, 429 and truncation rates.
+
+Run standalone:
+    python -m tools.mock_llm --port 8900 --latency 2 --error-rate 0.05 --rate-limit-rate 0.05
+then point the service at it:
+    EURON_BASE_URL=http://127.0.0.1:8900 OPENAI_BASE_URL=http://127.0.0.1:8900 ...
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+# Marker the load tester uses to tell LLM output from the offline template
+MOCK_MARKER = '<!-- mock-llm -->'
+
+MOCK_HTML = f"""<!DOCTYPE html>
+{MOCK_MARKER}
+<html lang="en">
+<head><meta charset="UTF-8"><title>Mock Portfolio</title>
+<style>body {{ font-family: sans-serif; }} .hero {{ padding: 40px; }}</style></head>
+<body><section class="hero"><h1>Mock Portfolio</h1><p>Generated by the mock LLM server.</p></section></body>
+</html>"""
+
+# Reply to theme-library content prompts (markup only, the theme supplies CSS)
+MOCK_CONTENT = f"""<main class="portfolio">
+{MOCK_MARKER}
+<header><h1>Mock Portfolio</h1><p>Generated by the mock LLM server.</p></header>
+<div class="container"><section id="about"><h2>About Me</h2><p class="about-text">Mock content.</p></section></div>
+<footer><p>Mock footer</p></footer>
+</main>"""
+
+
+@dataclass
+class MockSettings:
+    """Latency and failure distribution of the mock providers"""
+    latency: float = 1.0            # median seconds (lognormal)
+    latency_sigma: float = 0.3
+    error_rate: float = 0.0         # share of 500 responses
+    rate_limit_rate: float = 0.0    # share of 429 responses
+    retry_after: float = 1.0
+    truncate_rate: float = 0.0      # share of responses cut off at max_tokens
+    seed: Optional[int] = None
+
+
+class MockLLMServer:
+    """Threaded mock provider server, usable in-process or from the command line"""
+
+    def __init__(self, settings: MockSettings, host: str = '127.0.0.1', port: int = 0):
+        self.settings = settings
+        self.random = random.Random(settings.seed)
+        self._lock = threading.Lock()
+        self.counts = {'ok': 0, 'error': 0, 'rate_limited': 0, 'truncated': 0}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'MockLLMServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _draw(self):
+        """Pick (outcome, delay) for one request"""
+        s = self.settings
+        with self._lock:
+            delay = self.random.lognormvariate(0, s.latency_sigma) * s.latency if s.latency > 0 else 0
+            roll = self.random.random()
+            if roll < s.error_rate:
+                outcome = 'error'
+            elif roll < s.error_rate + s.rate_limit_rate:
+                outcome = 'rate_limited'
+            elif self.random.random() < s.truncate_rate:
+                outcome = 'truncated'
+            else:
+                outcome = 'ok'
+            self.counts[outcome] += 1
+        return outcome, delay
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so pooled clients reuse connections as with real providers
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, headers=None):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                outcome, delay = server._draw()
+                time.sleep(delay)
+
+                if outcome == 'error':
+                    return self._send(500, {'error': {'message': 'mock server error'}})
+                if outcome == 'rate_limited':
+                    return self._send(429, {'error': {'message': 'mock rate limit'}},
+                                      {'Retry-After': str(server.settings.retry_after)})
+
+                document = MOCK_CONTENT if _is_content_prompt(request) else MOCK_HTML
+                truncated = outcome == 'truncated' and not _is_continuation(request)
+                text = document[:len(document) // 2] if truncated else document
+                if _is_continuation(request):
+                    text = document[len(document) // 2:]
+                finish_reason = 'length' if truncated else 'stop'
+                self._send(200, _format_response(self.path, request, text, finish_reason))
+
+        return Handler
+
+
+def _is_continuation(request: dict) -> bool:
+    messages = request.get('messages') or request.get('input', {}).get('messages') or []
+    return any(m.get('role') == 'assistant' for m in messages)
+
+
+def _is_content_prompt(request: dict) -> bool:
+    messages = request.get('messages') or request.get('input', {}).get('messages') or []
+    prompt = messages[0].get('content', '') if messages else request.get('prompt', '')
+    return 'Output ONLY the <main' in prompt
+
+
+def _format_response(path: str, request: dict, text: str, finish_reason: str) -> dict:
+    """Shape the reply like the provider behind `path`"""
+    if path.endswith('/inference'):
+        return {'output': {'choices': [{'text': text, 'finish_reason': finish_reason}]}}
+    if path.endswith('/generation'):
+        return {'output': {'text': text, 'finish_reason': finish_reason}}
+    return {
+        'id': 'chatcmpl-mock',
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': request.get('model', 'mock'),
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': text},
+            'finish_reason': finish_reason,
+        }],
+        'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+    }
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--latency', type=float, default=1.0, help='median provider latency (s)')
+    parser.add_argument('--latency-sigma', type=float, default=0.3, help='lognormal spread')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of 500 responses')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='share of 429 responses')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After sent with 429s')
+    parser.add_argument('--truncate-rate', type=float, default=0.0, help='share of truncated replies')
+    parser.add_argument('--seed', type=int, default=None)
+
+
+def settings_from_args(args) -> MockSettings:
+    return MockSettings(args.latency, args.latency_sigma, args.error_rate,
+                        args.rate_limit_rate, args.retry_after, args.truncate_rate, args.seed)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mock LLM provider server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockLLMServer(settings_from_args(args), args.host, args.port)
+    print(f"Mock LLM server on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,29 @@
+import os
+import threading
+from app import create_app
+from app.services.generation_worker import run_worker
+
+if __name__ == '__main__':
+    app = create_app()
+    queue = app.extensions['job_queue']
+    visibility_timeout = app.config['JOB_VISIBILITY_TIMEOUT']
+    concurrency = int(os.getenv('WORKER_CONCURRENCY', 4))
+    
+    print(f"Generation worker: {concurrency} threads, queue {app.config['JOB_QUEUE_URL']}")
+    if float(os.getenv('LLM_TOTAL_TIMEOUT', 240)) >= visibility_timeout:
+        print("Warning: LLM_TOTAL_TIMEOUT is not below JOB_VISIBILITY_TIMEOUT; "
+              "slow generations will be delivered to a second worker")
+    stop_event = threading.Event()
+    threads = [
+        threading.Thread(target=run_worker, args=(queue, visibility_timeout),
+                         kwargs={'stop_event': stop_event}, daemon=True)
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        stop_event.set()
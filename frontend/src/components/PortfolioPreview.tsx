@@ -1,6 +1,9 @@
-import React from 'react';
+import React, { useState } from 'react';
+import axios from 'axios';
 import './PortfolioPreview.css';
 
+const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000';
+
 interface PortfolioPreviewProps {
   portfolio: {
     html: string;
@@ -9,6 +12,30 @@ interface PortfolioPreviewProps {
 }
 
 const PortfolioPreview: React.FC<PortfolioPreviewProps> = ({ portfolio }) => {
+  const [exporting, setExporting] = useState(false);
+
+  // Static-site bundle: hashed CSS, minified HTML, .gz/.br siblings, zipped by the backend
+  const handleExport = async () => {
+    try {
+      setExporting(true);
+      const response = await axios.post(
+        `${API_URL}/api/export`,
+        { portfolio: portfolio.html },
+        { responseType: 'blob' }
+      );
+      const url = URL.createObjectURL(response.data);
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = 'portfolio-site.zip';
+      link.click();
+      URL.revokeObjectURL(url);
+    } catch (error: any) {
+      alert('Export failed: ' + (error.message || 'An error occurred'));
+    } finally {
+      setExporting(false);
+    }
+  };
+
   if (portfolio.error) {
     return (
       <div className="portfolio-preview">
@@ -31,6 +58,9 @@ const PortfolioPreview: React.FC<PortfolioPreviewProps> = ({ portfolio }) => {
         >
           ⬇ Download HTML
         </a>
+        <button onClick={handleExport} disabled={exporting} className="download-btn">
+          {exporting ? 'Exporting...' : '📦 Download Site Bundle'}
+        </button>
       </div>
       
       <div className="preview-container">
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import axios from 'axios';
 import './ResumeUpload.css';
 
@@ -12,6 +12,7 @@ interface ResumeUploadProps {
 
 const LLM_MODELS = [
   { label: 'Offline Mode (No API needed)', value: 'offline' },
+  { label: 'Auto (fastest/cheapest available)', value: 'auto' },
   { label: 'OpenAI GPT-4o', value: 'gpt-4o' },
   { label: 'OpenAI GPT-4o Mini (Recommended)', value: 'gpt-4o-mini' },
   { label: 'OpenAI GPT-4 Turbo', value: 'gpt-4-turbo' },
@@ -23,6 +24,12 @@ const LLM_MODELS = [
   { label: 'Alibaba Qwen 3 32B', value: 'qwen/qwen3-32b' },
 ];
 
+// Progressive mode: poll for the LLM upgrade of the instant template preview
+const UPGRADE_POLL_MS = 2000;
+const UPGRADE_MAX_POLLS = 90;
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
 const ResumeUpload: React.FC<ResumeUploadProps> = ({
   onPortfolioGenerated,
   onError,
@@ -33,6 +40,12 @@ const ResumeUpload: React.FC<ResumeUploadProps> = ({
   const [message, setMessage] = useState('');
   const [selectedModel, setSelectedModel] = useState(LLM_MODELS[0].value);
   const [apiKey, setApiKey] = useState('');
+  // Upgrade currently being polled; a new upload or unmount clears it so stale polls stop
+  const activeUpgrade = useRef<string | null>(null);
+
+  useEffect(() => () => {
+    activeUpgrade.current = null;
+  }, []);
 
   const handleDragOver = (e: React.DragEvent<HTMLDivElement>) => {
     e.preventDefault();
@@ -60,12 +73,50 @@ const ResumeUpload: React.FC<ResumeUploadProps> = ({
     }
   };
 
+  const pollUpgrade = async (upgradeId: string) => {
+    activeUpgrade.current = upgradeId;
+    const isActive = () => activeUpgrade.current === upgradeId;
+    for (let i = 0; i < UPGRADE_MAX_POLLS; i++) {
+      await sleep(UPGRADE_POLL_MS);
+      if (!isActive()) {
+        return;
+      }
+      try {
+        const response = await axios.get(`${API_URL}/api/upgrade/${upgradeId}`);
+        if (!isActive()) {
+          return;
+        }
+        if (response.data.status === 'done') {
+          activeUpgrade.current = null;
+          onPortfolioGenerated(response.data.portfolio);
+          setMessage('Portfolio generated successfully!');
+          return;
+        }
+        if (response.data.status !== 'pending') {
+          break;
+        }
+      } catch (error: any) {
+        // 404 (not visible to this server yet), 5xx and network errors are transient: keep polling
+        const status = error.response?.status;
+        if (status !== undefined && status !== 404 && status < 500) {
+          break;
+        }
+      }
+    }
+    if (isActive()) {
+      activeUpgrade.current = null;
+      setMessage('Showing the template version (AI generation unavailable)');
+    }
+  };
+
   const handleSubmit = async (e: React.FormEvent<HTMLFormElement>) => {
     e.preventDefault();
     if (!file) {
       setMessage('Please select a resume file');
       return;
     }
+    // A poll for the previous upload must not overwrite this one's portfolio
+    activeUpgrade.current = null;
 
     const formData = new FormData();
     formData.append('resume', file);
@@ -73,6 +124,9 @@ const ResumeUpload: React.FC<ResumeUploadProps> = ({
     if (apiKey.trim()) {
       formData.append('api_key', apiKey);
     }
+    if (selectedModel !== 'offline') {
+      formData.append('progressive', 'true');
+    }
 
     try {
       onLoading(true);
@@ -83,9 +137,17 @@ const ResumeUpload: React.FC<ResumeUploadProps> = ({
       });
 
       if (response.data.success) {
-        setMessage('Portfolio generated successfully!');
         onPortfolioGenerated(response.data.portfolio);
         setFile(null);
+        if (response.data.upgrade_id) {
+          setMessage('Preview ready - generating a richer design...');
+          // Not awaited: this submit is finished, and a later one must not wait on or be reset by it
+          pollUpgrade(response.data.upgrade_id);
+        } else if (response.data.busy) {
+          setMessage('Showing the template version (AI generation busy, try again later)');
+        } else {
+          setMessage('Portfolio generated successfully!');
+        }
       } else {
         onError(response.data.error || 'Failed to generate portfolio');
         setMessage('Error: ' + (response.data.error || 'Failed to generate portfolio'));
@@ -121,7 +183,9 @@ const ResumeUpload: React.FC<ResumeUploadProps> = ({
           <p className="model-hint">
             {selectedModel === 'offline' 
               ? 'No API key needed - uses template-based generation'
-              : 'You must provide your API key for this provider'}
+              : selectedModel === 'auto'
+                ? 'Picks a provider based on resume size, latency and cost (API key optional)'
+                : 'You must provide your API key for this provider'}
           </p>
         </div>
 